@@ -1,23 +1,15 @@
 import streamlit as st
-import plotly.graph_objects as go
 import base64
 from datetime import datetime
-import io
 
-# PDF Generation imports
-try:
-    from reportlab.platypus import (
-        SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-    )
-    from reportlab.platypus.flowables import HRFlowable
-    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib import colors
-    from reportlab.graphics.shapes import Drawing, Rect, String
-    from reportlab.graphics.charts.barcharts import HorizontalBarChart
-    PDF_AVAILABLE = True
-except ImportError:
-    PDF_AVAILABLE = False
+from budget_analytics import cached_view, trailing_actuals
+from fhi_engine import best_next_peso, calculate_fhi
+from figures import component_radar, fhi_gauge
+from pdf_reports import (
+    PDF_AVAILABLE, cancel_pdf_report, generate_fynstra_pdf, generate_text_report, prefetch_pdf_report, report_cache_stats,
+    report_progress,
+)
+from storage import open_sheet, with_backoff
 
 # --- Sidebar Logo and Title (PUT THIS FIRST) ---
 def get_base64_image(image_path):
@@ -74,323 +66,41 @@ if bg_base64:
     )
 
 # ===============================
-# PDF GENERATION FUNCTIONS
+# UTILITY FUNCTIONS
 # ===============================
 
-def create_pdf_styles():
-    """Create PDF styles matching Fynstra's color scheme"""
-    if not PDF_AVAILABLE:
-        return None
-        
-    base_styles = getSampleStyleSheet()
-    
-    # Fynstra color palette
-    FYNSTRA_RED = colors.HexColor("#fc3134")
-    FYNSTRA_ORANGE = colors.HexColor("#ff5f1f") 
-    FYNSTRA_GOLD = colors.HexColor("#ffc542")
-    DARK_GRAY = colors.HexColor("#333333")
-    MEDIUM_GRAY = colors.HexColor("#666666")
-    LIGHT_GRAY = colors.HexColor("#f8f9fa")
-    
-    styles = {
-        "title": ParagraphStyle(
-            "title",
-            parent=base_styles["Heading1"],
-            fontName="Helvetica-Bold",
-            fontSize=24,
-            leading=28,
-            textColor=FYNSTRA_RED,
-            spaceAfter=12,
-            alignment=1,
-        ),
-        "subtitle": ParagraphStyle(
-            "subtitle",
-            parent=base_styles["BodyText"],
-            fontName="Helvetica",
-            fontSize=12,
-            leading=16,
-            textColor=MEDIUM_GRAY,
-            spaceAfter=16,
-            alignment=1,
-        ),
-        "section_header": ParagraphStyle(
-            "section_header",
-            parent=base_styles["Heading2"],
-            fontName="Helvetica-Bold",
-            fontSize=16,
-            leading=20,
-            textColor=FYNSTRA_ORANGE,
-            spaceBefore=12,
-            spaceAfter=8,
-        ),
-        "body": ParagraphStyle(
-            "body",
-            parent=base_styles["BodyText"],
-            fontName="Helvetica",
-            fontSize=11,
-            leading=15,
-            textColor=DARK_GRAY,
-            spaceAfter=8,
-        ),
-        "small": ParagraphStyle(
-            "small",
-            parent=base_styles["BodyText"],
-            fontName="Helvetica",
-            fontSize=9,
-            leading=12,
-            textColor=MEDIUM_GRAY,
-            spaceAfter=4,
-        ),
-        "score": ParagraphStyle(
-            "score",
-            parent=base_styles["Heading1"],
-            fontName="Helvetica-Bold",
-            fontSize=36,
-            leading=40,
-            textColor=FYNSTRA_RED,
-            alignment=1,
-        ),
+FINANCIAL_FIELDS = [
+    "age", "monthly_income", "monthly_expenses", "monthly_savings", "monthly_debt",
+    "total_investments", "net_worth", "emergency_fund", "last_FHI"
+]
+
+def remember_persisted_financial_data(user_id, row_idx, header, row):
+    """Record a user's sheet row position and stored financial values as the last-persisted snapshot"""
+    values = {}
+    for field in FINANCIAL_FIELDS:
+        if field in header:
+            col_idx = header.index(field)
+            try:
+                values[field] = float(row[col_idx]) if len(row) > col_idx and row[col_idx] != "" else None
+            except (ValueError, TypeError):
+                values[field] = None
+    persisted = {"user_id": user_id, "row": row_idx, "header": list(header), "values": values}
+    st.session_state["persisted_financial_data"] = persisted
+    return persisted
+
+def changed_financial_fields(data_to_save, persisted):
+    """Return the fields of data_to_save (that the sheet has a column for) whose value differs from the last-persisted snapshot"""
+    if not persisted:
+        return dict(data_to_save)
+    return {
+        field: value for field, value in data_to_save.items()
+        if field in persisted["values"] and persisted["values"][field] != float(value)
     }
-    return styles, FYNSTRA_RED, FYNSTRA_ORANGE, FYNSTRA_GOLD, LIGHT_GRAY
-
-def create_fhi_score_banner(fhi_score: float):
-    """Create a visual banner for the FHI score"""
-    if not PDF_AVAILABLE:
-        return None
-        
-    d = Drawing(500, 80)
-    
-    # Background rectangle
-    d.add(Rect(0, 0, 500, 80, fillColor=colors.white, strokeColor=colors.HexColor("#e5e7eb"), strokeWidth=1))
-    
-    # Gradient bar at top
-    d.add(Rect(0, 70, 250, 10, fillColor=colors.HexColor("#fc3134"), strokeColor=None))
-    d.add(Rect(250, 70, 250, 10, fillColor=colors.HexColor("#ffc542"), strokeColor=None))
-    
-    # Title and score
-    title = String(20, 45, "Financial Health Index", fontName="Helvetica-Bold", fontSize=16, fillColor=colors.HexColor("#333333"))
-    score = String(320, 35, f"{fhi_score:.1f}", fontName="Helvetica-Bold", fontSize=28, fillColor=colors.HexColor("#fc3134"))
-    score_label = String(420, 40, "/ 100", fontName="Helvetica", fontSize=14, fillColor=colors.HexColor("#666666"))
-    
-    d.add(title)
-    d.add(score)
-    d.add(score_label)
-    
-    return d
-
-def create_component_chart(components: dict):
-    """Create a horizontal bar chart for component scores"""
-    if not PDF_AVAILABLE:
-        return None
-        
-    labels = list(components.keys())
-    values = [float(components[k]) for k in labels]
-
-    d = Drawing(500, 250)
-    chart = HorizontalBarChart()
-    chart.x = 80
-    chart.y = 30
-    chart.height = 190
-    chart.width = 400
-    chart.data = [values]
-    chart.categoryAxis.categoryNames = labels
-    chart.categoryAxis.labels.fontName = "Helvetica"
-    chart.categoryAxis.labels.fontSize = 10
-    chart.valueAxis.valueMin = 0
-    chart.valueAxis.valueMax = 100
-    chart.valueAxis.labels.fontName = "Helvetica"
-    chart.valueAxis.labels.fontSize = 9
-    
-    # Fynstra color for bars
-    chart.bars[0].fillColor = colors.HexColor("#ff5f1f")
-    chart.bars[0].strokeColor = colors.white
-    chart.barLabelFormat = "%0.0f"
-    chart.barLabels.fontName = "Helvetica-Bold"
-    chart.barLabels.fontSize = 9
-    chart.barLabels.fillColor = colors.HexColor("#333333")
-    
-    d.add(chart)
-    return d
-
-def create_data_table(data_rows):
-    """Create a styled table for financial data"""
-    if not PDF_AVAILABLE:
-        return None
-        
-    table = Table(data_rows, colWidths=[180, 200])
-    table.setStyle(TableStyle([
-        ("FONT", (0, 0), (-1, -1), "Helvetica", 10),
-        ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
-        ("TEXTCOLOR", (0, 0), (0, -1), colors.HexColor("#666666")),
-        ("TEXTCOLOR", (1, 0), (1, -1), colors.HexColor("#333333")),
-        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-        ("ROWBACKGROUNDS", (0, 0), (-1, -1), [colors.white, colors.HexColor("#f8f9fa")]),
-        ("LINEBELOW", (0, 0), (-1, -1), 0.5, colors.HexColor("#e5e7eb")),
-        ("LEFTPADDING", (0, 0), (-1, -1), 10),
-        ("RIGHTPADDING", (0, 0), (-1, -1), 10),
-        ("TOPPADDING", (0, 0), (-1, -1), 8),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
-    ]))
-    return table
-
-def generate_fynstra_pdf(fhi_score: float, components: dict, user_inputs: dict) -> bytes:
-    """Generate a professional PDF report with Fynstra branding"""
-    if not PDF_AVAILABLE:
-        return generate_text_report(fhi_score, components, user_inputs).encode('utf-8')
-    
-    try:
-        styles_data = create_pdf_styles()
-        if styles_data is None:
-            return generate_text_report(fhi_score, components, user_inputs).encode('utf-8')
-            
-        styles, FYNSTRA_RED, FYNSTRA_ORANGE, FYNSTRA_GOLD, LIGHT_GRAY = styles_data
-        
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=A4,
-            leftMargin=40,
-            rightMargin=40,
-            topMargin=40,
-            bottomMargin=40,
-            title="Fynstra Financial Health Report"
-        )
-        
-        story = []
-        
-        # Header
-        story.append(Paragraph("Financial Health Report", styles["title"]))
-        story.append(Paragraph(
-            f"Generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')} | Fynstra AI Platform",
-            styles["subtitle"]
-        ))
-        story.append(Spacer(1, 20))
-        
-        # FHI Score Banner
-        banner = create_fhi_score_banner(fhi_score)
-        if banner:
-            story.append(banner)
-        story.append(Spacer(1, 20))
-        
-        # Overall Assessment
-        if fhi_score >= 85:
-            assessment = "Excellent! You're in great financial shape and well-prepared for the future."
-        elif fhi_score >= 70:
-            assessment = "Good! You have a solid foundation. Stay consistent and work on gaps where needed."
-        elif fhi_score >= 50:
-            assessment = "Fair. You're on your way, but some areas need attention to build a stronger safety net."
-        else:
-            assessment = "Needs Improvement. Your finances require urgent attention."
-            
-        story.append(Paragraph("Overall Assessment", styles["section_header"]))
-        story.append(Paragraph(assessment, styles["body"]))
-        story.append(Spacer(1, 15))
-        
-        # Financial Profile
-        story.append(HRFlowable(width="100%", thickness=1, color=FYNSTRA_ORANGE))
-        story.append(Spacer(1, 10))
-        story.append(Paragraph("Your Financial Profile", styles["section_header"]))
-        
-        profile_data = [
-            ["Age", f"{user_inputs.get('age', 'N/A')} years"],
-            ["Monthly Income", f"₱{user_inputs.get('income', 0):,.0f}"],
-            ["Monthly Expenses", f"₱{user_inputs.get('expenses', 0):,.0f}"],
-            ["Monthly Savings", f"₱{user_inputs.get('savings', 0):,.0f}"],
-            ["Total Investments", f"₱{user_inputs.get('total_investments', 0):,.0f}"],
-            ["Net Worth", f"₱{user_inputs.get('net_worth', 0):,.0f}"],
-            ["Emergency Fund", f"₱{user_inputs.get('emergency_fund', 0):,.0f}"],
-        ]
-        
-        profile_table = create_data_table(profile_data)
-        if profile_table:
-            story.append(profile_table)
-        story.append(Spacer(1, 20))
-        
-        # Component Breakdown
-        story.append(HRFlowable(width="100%", thickness=1, color=FYNSTRA_ORANGE))
-        story.append(Spacer(1, 10))
-        story.append(Paragraph("Component Breakdown", styles["section_header"]))
-        story.append(Paragraph(
-            "Your FHI score is calculated from five key components. Each component is scored from 0 to 100, with higher scores indicating better financial health.",
-            styles["body"]
-        ))
-        story.append(Spacer(1, 10))
-        
-        # Component chart
-        chart = create_component_chart(components)
-        if chart:
-            story.append(chart)
-        story.append(Spacer(1, 15))
-        
-        # Component details
-        component_data = []
-        for component, score in components.items():
-            component_data.append([component, f"{score:.1f}/100"])
-        
-        component_table = create_data_table(component_data)
-        if component_table:
-            story.append(component_table)
-        story.append(Spacer(1, 20))
-        
-        # Recommendations
-        story.append(HRFlowable(width="100%", thickness=1, color=FYNSTRA_ORANGE))
-        story.append(Spacer(1, 10))
-        story.append(Paragraph("Key Recommendations", styles["section_header"]))
-        
-        recommendations = []
-        if components.get("Emergency Fund", 0) < 60:
-            recommendations.append("Build your emergency fund to cover 3-6 months of expenses")
-        if components.get("Debt-to-Income", 0) < 70:
-            recommendations.append("Focus on reducing high-interest debt to improve your debt-to-income ratio")
-        if components.get("Savings Rate", 0) < 20:
-            recommendations.append("Increase your monthly savings rate to at least 20% of income")
-        if components.get("Investment", 0) < 50:
-            recommendations.append("Start or increase regular investments for long-term wealth building")
-        if components.get("Net Worth", 0) < 50:
-            recommendations.append("Focus on building assets and reducing liabilities to grow net worth")
-        
-        if not recommendations:
-            recommendations.append("Continue your excellent financial habits and consider advanced investment strategies")
-        
-        for i, rec in enumerate(recommendations[:5], 1):
-            story.append(Paragraph(f"{i}. {rec}", styles["body"]))
-        
-        story.append(Spacer(1, 20))
-        
-        # Footer
-        story.append(HRFlowable(width="100%", thickness=0.5, color=LIGHT_GRAY))
-        story.append(Spacer(1, 10))
-        story.append(Paragraph(
-            "This report is for informational purposes only and does not constitute financial advice. "
-            "For personalized financial planning, consult with a qualified financial advisor.",
-            styles["small"]
-        ))
-        story.append(Spacer(1, 5))
-        story.append(Paragraph(
-            "Generated by Fynstra AI - Your AI-Powered Financial Strategy Platform",
-            styles["small"]
-        ))
-        
-        doc.build(story)
-        pdf_data = buffer.getvalue()
-        buffer.close()
-        return pdf_data
-        
-    except Exception as e:
-        st.error(f"PDF generation failed: {e}. Generating text report instead.")
-        return generate_text_report(fhi_score, components, user_inputs).encode('utf-8')
-
-# ===============================
-# UTILITY FUNCTIONS
-# ===============================
 
 def load_user_financial_data():
     """Load user's financial data if they are signed in"""
     try:
         from supabase import create_client
-        import gspread
-        from google.oauth2.service_account import Credentials
         import time
         
         user_id = st.session_state.get("user_id")
@@ -403,14 +113,9 @@ def load_user_financial_data():
             return False
             
         try:
-            sa_info = dict(st.secrets["GOOGLE_SERVICE_ACCOUNT"])
-            scopes = [
-                "https://www.googleapis.com/auth/spreadsheets",
-                "https://www.googleapis.com/auth/drive",
-            ]
-            creds = Credentials.from_service_account_info(sa_info, scopes=scopes)
-            gc = gspread.authorize(creds)
-            sh = gc.open_by_key(st.secrets["SHEET_ID"])
+            sh = open_sheet()
+            if not sh:
+                return False
             ws = sh.worksheet("Users")
         except Exception as e:
             if "429" in str(e) or "Quota exceeded" in str(e):
@@ -434,9 +139,10 @@ def load_user_financial_data():
             uid_idx = header.index("user_id")
             user_row = None
             
-            for row in rows:
+            for i, row in enumerate(rows, start=2):
                 if len(row) > uid_idx and row[uid_idx] == user_id:
                     user_row = row
+                    remember_persisted_financial_data(user_id, i, header, row)
                     break
                     
             if not user_row:
@@ -495,13 +201,14 @@ def load_user_financial_data():
         return False
 
 def save_user_financial_data():
-    """Save user's financial data to the database"""
+    """Save user's financial data to the database.
+
+    Returns True if data was written, None if there was nothing to write, and False if the save failed.
+    """
     try:
         from supabase import create_client
         import gspread
-        from google.oauth2.service_account import Credentials
         import time
-        import random
         from datetime import datetime
         
         user_id = st.session_state.get("user_id")
@@ -511,12 +218,6 @@ def save_user_financial_data():
         if not user_id:
             return False
             
-        last_save_time = st.session_state.get("last_save_time", 0)
-        current_time = time.time()
-        if current_time - last_save_time < 30:
-            st.info("⏱️ Please wait before saving again (rate limiting)")
-            return False
-            
         data_to_save = {
             "age": st.session_state.get("age", 0),
             "monthly_income": st.session_state.get("monthly_income", 0),
@@ -533,15 +234,21 @@ def save_user_financial_data():
         if not has_meaningful_data:
             return False
         
+        # Nothing to write if every field matches what was last persisted for this user
+        persisted = st.session_state.get("persisted_financial_data")
+        if persisted and persisted["user_id"] == user_id and not changed_financial_fields(data_to_save, persisted):
+            return None
+            
+        last_save_time = st.session_state.get("last_save_time", 0)
+        current_time = time.time()
+        if current_time - last_save_time < 30:
+            st.info("⏱️ Please wait before saving again (rate limiting)")
+            return False
+        
         try:
-            sa_info = dict(st.secrets["GOOGLE_SERVICE_ACCOUNT"])
-            scopes = [
-                "https://www.googleapis.com/auth/spreadsheets",
-                "https://www.googleapis.com/auth/drive",
-            ]
-            creds = Credentials.from_service_account_info(sa_info, scopes=scopes)
-            gc = gspread.authorize(creds)
-            sh = gc.open_by_key(st.secrets["SHEET_ID"])
+            sh = open_sheet()
+            if not sh:
+                return False
             ws = sh.worksheet("Users")
         except Exception as e:
             if "429" in str(e) or "Quota exceeded" in str(e):
@@ -552,24 +259,36 @@ def save_user_financial_data():
                 return False
             
         try:
-            values = ws.get_all_values()
-            if not values:
-                return False
+            if persisted and persisted["user_id"] == user_id:
+                # Rows can be deleted or sorted in the sheet, so confirm the remembered row is still this user's
+                uid_cell = gspread.utils.rowcol_to_a1(persisted["row"], persisted["header"].index("user_id") + 1)
+                if with_backoff(lambda: ws.acell(uid_cell).value) != user_id:
+                    persisted = None
+            if persisted and persisted["user_id"] == user_id:
+                # Row position and sheet values are already known; skip re-reading the whole sheet
+                header = persisted["header"]
+                user_row_idx = persisted["row"]
+            else:
+                values = ws.get_all_values()
+                if not values:
+                    return False
+                    
+                header = values[0]
+                rows = values[1:] if len(values) > 1 else []
                 
-            header = values[0]
-            rows = values[1:] if len(values) > 1 else []
-            
-            if "user_id" not in header:
-                return False
+                if "user_id" not in header:
+                    return False
+                    
+                uid_idx = header.index("user_id")
+                user_row_idx = None
                 
-            uid_idx = header.index("user_id")
-            user_row_idx = None
-            
-            for i, row in enumerate(rows, start=2):
-                if len(row) > uid_idx and row[uid_idx] == user_id:
-                    user_row_idx = i
-                    break
+                for i, row in enumerate(rows, start=2):
+                    if len(row) > uid_idx and row[uid_idx] == user_id:
+                        user_row_idx = i
+                        persisted = remember_persisted_financial_data(user_id, i, header, row)
+                        break
                     
+            created = False
             if not user_row_idx:
                 now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                 new_row_data = []
@@ -593,6 +312,8 @@ def save_user_financial_data():
                 try:
                     ws.append_row(new_row_data)
                     user_row_idx = len(rows) + 2
+                    persisted = remember_persisted_financial_data(user_id, user_row_idx, header, new_row_data)
+                    created = True
                     st.success("📝 Created your user profile in the database")
                 except Exception as e:
                     st.error(f"Failed to create user profile: {e}")
@@ -600,8 +321,9 @@ def save_user_financial_data():
             
             cells_to_update = []
             updated_fields = []
+            changed = changed_financial_fields(data_to_save, persisted)
             
-            for field, value in data_to_save.items():
+            for field, value in changed.items():
                 if field in header:
                     col_idx = header.index(field) + 1
                     cell_address = gspread.utils.rowcol_to_a1(user_row_idx, col_idx)
@@ -612,29 +334,14 @@ def save_user_financial_data():
                     updated_fields.append(field)
             
             if cells_to_update:
-                def with_backoff(fn, tries: int = 3):
-                    for i in range(tries):
-                        try:
-                            return fn()
-                        except Exception as e:
-                            if "429" in str(e) or "Quota exceeded" in str(e):
-                                if i < tries - 1:
-                                    wait_time = (2 ** i) + random.uniform(5, 15)
-                                    time.sleep(wait_time)
-                                else:
-                                    raise
-                            else:
-                                if i == tries - 1:
-                                    raise
-                                time.sleep((2 ** i) + random.random())
-                
                 with_backoff(lambda: ws.batch_update(cells_to_update))
                 st.session_state["last_save_time"] = current_time
+                persisted["values"].update({field: float(changed[field]) for field in updated_fields})
                 
                 if updated_fields:
                     st.success(f"💾 Successfully saved {len(updated_fields)} financial fields!")
                     
-            return len(updated_fields) > 0
+            return True if created or updated_fields else None
             
         except Exception as e:
             if "429" in str(e) or "Quota exceeded" in str(e):
@@ -691,39 +398,21 @@ def validated_number_input(label, key, min_value=0.0, step=1.0, help_text=None,
     update_status()
     return value
 
-def create_component_radar_chart(components):
-    """Create radar chart for component breakdown"""
-    categories = list(components.keys())
-    values = list(components.values())
-    
-    fig = go.Figure()
-    
-    fig.add_trace(go.Scatterpolar(
-        r=values,
-        theta=categories,
-        fill='toself',
-        name='Your Scores',
-        line_color='blue'
-    ))
-    
-    fig.add_trace(go.Scatterpolar(
-        r=[70] * len(categories),  # Target scores
-        theta=categories,
-        fill='toself',
-        name='Target (70%)',
-        line_color='green',
-        opacity=0.3
-    ))
-    
-    fig.update_layout(
-        polar=dict(
-            radialaxis=dict(visible=True, range=[0, 100])
-        ),
-        showlegend=True,
-        height=400,
-    )
-    
-    return fig
+def get_budget_actuals(months):
+    """Trailing-N-month averages from the Budget Tracker rollups, cached per ledger version"""
+    rollups = st.session_state.get("budget_rollups")
+    if not rollups or not rollups["cells"]:
+        return None
+    cache = st.session_state.setdefault("budget_view_cache", {})
+    return cached_view(cache, f"trailing_actuals_{months}", rollups,
+                       lambda r: trailing_actuals(r, months))
+
+def prefill_from_budget(actuals, overwrite=False):
+    """Copy Budget Tracker actuals into the income, expenses and savings inputs"""
+    for widget_key, field in (("income", "income"), ("expenses", "expenses"), ("savings", "savings")):
+        if overwrite or not st.session_state.get(widget_key):
+            st.session_state[widget_key] = round(float(actuals[field]), 2)
+            st.session_state.pop(f"{widget_key}_status", None)
 
 def interpret(label, score):
     if label == "Net Worth":
@@ -777,39 +466,96 @@ def interpret(label, score):
             "Set a monthly auto-save amount."
         ]
 
-def generate_text_report(fhi_score, components, user_data):
-    """Generate a text report for download"""
-    report = f"""
-FYNSTRA FINANCIAL HEALTH REPORT
-Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-===========================================
-OVERALL FINANCIAL HEALTH INDEX (FHI): {fhi_score}/100
-===========================================
+def weak_areas_text(components):
+    """Summary sentence naming the components scoring below 60"""
+    labels = {
+        "Net Worth": "net worth",
+        "Debt-to-Income": "debt-to-income ratio",
+        "Savings Rate": "savings rate",
+        "Investment": "investment levels",
+        "Emergency Fund": "emergency fund",
+    }
+    weak_areas = [labels[name] for name, score in components.items() if score < 60]
 
-USER PROFILE:
-Age: {user_data['age']} years
-Monthly Income: ₱{user_data['income']:,.2f}
-Monthly Expenses: ₱{user_data['expenses']:,.2f}
-Monthly Savings: ₱{user_data['savings']:,.2f}
+    # Construct weakness text
+    weak_text = ""
+    if weak_areas:
+        if len(weak_areas) == 1:
+            weak_text = f" However, your {weak_areas[0]} needs improvement."
+        else:
+            all_but_last = ", ".join(weak_areas[:-1])
+            weak_text = f" However, your {all_but_last} and {weak_areas[-1]} need improvement."
+
+        weak_text += " Addressing this will help strengthen your overall financial health."
+    return weak_text
+
+def fhi_results_for(user_inputs):
+    """Return the FHI results for these inputs, reusing the previous run's results if the inputs are unchanged"""
+    input_key = tuple(float(value) for value in user_inputs.values())
+    cached = st.session_state.get("fhi_results")
+    if cached and cached.get("input_key") == input_key:
+        return cached
+    if cached and cached.get("report_handle"):
+        # The superseded report is no longer wanted; free its slot in the render queue
+        cancel_pdf_report(cached["report_handle"])
+
+    FHI, components = calculate_fhi(
+        user_inputs["age"], user_inputs["income"], user_inputs["expenses"], user_inputs["savings"],
+        user_inputs["debt"], user_inputs["total_investments"], user_inputs["net_worth"],
+        user_inputs["emergency_fund"])
+    results = {
+        "FHI": round(FHI, 2),
+        "raw_FHI": FHI,
+        "components": components,
+        "user_inputs": dict(user_inputs),
+        "input_key": input_key,
+        "weak_text": weak_areas_text(components),
+        "interpretations": {label: interpret(label, score) for label, score in components.items()},
+        "ranking": best_next_peso(user_inputs),
+    }
+    st.session_state["fhi_results"] = results
+    return results
 
-COMPONENT BREAKDOWN:
-"""
-    
-    for component, score in components.items():
-        report += f"\n{component}: {score:.1f}/100"
-        
-    report += f"""
+@st.fragment(run_every=0.5)
+def poll_pdf_report(handle):
+    """Show render progress, rerunning the page once the background report is ready"""
+    state, fraction = report_progress(handle)
+    if state in ("done", "failed"):
+        st.rerun()
+    st.progress(fraction, text="Preparing your PDF report..." if state == "rendering" else "Queued for rendering...")
 
-RECOMMENDATIONS:
-- Focus on improving components scoring below 60
-- Maintain consistency in savings and investments
-- Review and adjust your financial strategy regularly
+def pdf_report_download(handle, results):
+    """Download button for a prefetched PDF report, or its progress while it renders.
 
-This report was generated by Fynstra AI - Your Financial Strategy Platform
-"""
-    
-    return report
+    Without a handle (the render queue was full) the report is generated on request.
+    """
+    state, _ = report_progress(handle) if handle else ("failed", 1.0)
+    if state == "done":
+        st.download_button(
+            label="⬇️ Download PDF Report",
+            data=handle["future"].result(),
+            file_name=f"fynstra_report_{datetime.now().strftime('%Y%m%d')}.pdf",
+            mime="application/pdf",
+            use_container_width=True
+        )
+        stats = report_cache_stats()
+        if stats["mean_render_ms"] is not None:
+            st.caption(f"Report cache: {stats['hit_rate']:.0%} hit rate, "
+                       f"{stats['mean_render_ms']:.0f} ms average render")
+    elif state == "failed":
+        # Render in the foreground, which falls back to a text report if rendering fails
+        if st.button("📄 Generate PDF Report", use_container_width=True):
+            with st.spinner("Generating PDF report..."):
+                pdf_data = generate_fynstra_pdf(results["FHI"], results["components"], results["user_inputs"])
+            st.download_button(
+                label="⬇️ Download PDF Report",
+                data=pdf_data,
+                file_name=f"fynstra_report_{datetime.now().strftime('%Y%m%d')}.pdf",
+                mime="application/pdf",
+                use_container_width=True
+            )
+    else:
+        poll_pdf_report(handle)
 
 # ===============================
 # MAIN APPLICATION
@@ -943,6 +689,33 @@ with st.container(border=True):
 </p>
 """, unsafe_allow_html=True)
 
+    # Pre-fill income, expenses and savings from the Budget Tracker ledger
+    if st.session_state.get("budget_rollups", {}).get("cells"):
+        budget_col1, budget_col2 = st.columns([2, 1])
+        with budget_col1:
+            actual_months = st.selectbox("📒 Average Budget Tracker actuals over the last",
+                                         [1, 3, 6, 12], index=1, key="budget_actual_months",
+                                         format_func=lambda n: f"{n} month{'s' if n > 1 else ''}")
+        budget_actuals = get_budget_actuals(actual_months)
+
+        # Fill empty fields automatically once per ledger version
+        prefill_marker = (st.session_state["budget_rollups"]["version"], actual_months)
+        if st.session_state.get("budget_prefill_marker") != prefill_marker:
+            prefill_from_budget(budget_actuals)
+            st.session_state["budget_prefill_marker"] = prefill_marker
+
+        with budget_col2:
+            st.markdown("<div style='height:28px'></div>", unsafe_allow_html=True)
+            if st.button("📥 Use Budget Actuals", help="Overwrite income, expenses and savings with your Budget Tracker averages"):
+                prefill_from_budget(budget_actuals, overwrite=True)
+                st.rerun()
+        st.caption(
+            f"Budget Tracker {budget_actuals['from']} to {budget_actuals['through']} "
+            f"({budget_actuals['months']}-month average): "
+            f"income ₱{budget_actuals['income']:,.0f}, expenses ₱{budget_actuals['expenses']:,.0f}, "
+            f"savings ₱{budget_actuals['savings']:,.0f} per month"
+        )
+
     col1, col2 = st.columns(2)
     with col1:
         age               = validated_number_input("Your Age", key="age", min_value=18.0, step=1.0)
@@ -1057,76 +830,36 @@ if st.button("Check My Financial Health"):
         missing_fields_popup(missing_fields)
     else:
         st.session_state['proceed'] = True
+    st.session_state.pop("fhi_saved_inputs", None)
 
 # Run FHI calculation if allowed
 if st.session_state.get('proceed'):
     if monthly_income == 0 or monthly_expenses == 0:
         st.warning("Please input your income and expenses.")
     else:
-        # Age-based target multipliers
-        if age < 30:
-            alpha, beta = 2.5, 2.0
-        elif age < 40:
-            alpha, beta = 3.0, 3.0
-        elif age < 50:
-            alpha, beta = 3.5, 4.0
-        else:
-            alpha, beta = 4.0, 5.0
-
-        annual_income = monthly_income * 12
-
-        # Sub-scores
-        Nworth = min(max((net_worth / (annual_income * alpha)) * 100, 0), 100)
-        DTI = 100 - min((monthly_debt / monthly_income) * 100, 100)
-        Srate = min((monthly_savings / monthly_income) * 100, 100)
-        Invest = min(max((total_investments / (beta * annual_income)) * 100, 0), 100)
-        Emerg = min((emergency_fund / monthly_expenses) / 6 * 100, 100)
-
-        components = {
-            "Net Worth": Nworth,
-            "Debt-to-Income": DTI,
-            "Savings Rate": Srate,
-            "Investment": Invest,
-            "Emergency Fund": Emerg,
+        user_inputs = {
+            "age": age,
+            "income": monthly_income,
+            "expenses": monthly_expenses,
+            "savings": monthly_savings,
+            "debt": monthly_debt,
+            "total_investments": total_investments,
+            "net_worth": net_worth,
+            "emergency_fund": emergency_fund
         }
+        results = fhi_results_for(user_inputs)
+        FHI, FHI_rounded, components = results["raw_FHI"], results["FHI"], results["components"]
 
-        # Final FHI Score
-        FHI = 0.20 * Nworth + 0.15 * DTI + 0.15 * Srate + 0.15 * Invest + 0.20 * Emerg + 15
-        FHI_rounded = round(FHI, 2)
-        
-        # Store results in session state
-        st.session_state["fhi_results"] = {
-            "FHI": FHI_rounded,
-            "components": components,
-            "user_inputs": {
-                "age": age,
-                "income": monthly_income,
-                "expenses": monthly_expenses,
-                "savings": monthly_savings,
-                "debt": monthly_debt,
-                "total_investments": total_investments,
-                "net_worth": net_worth,
-                "emergency_fund": emergency_fund
-            }
-        }
+        # Start rendering the PDF report now so it is usually ready before it is requested;
+        # the handle lives with the memoized results, so reruns keep polling the same job
+        if PDF_AVAILABLE and "report_handle" not in results:
+            results["report_handle"] = prefetch_pdf_report(FHI_rounded, components, results["user_inputs"])
+        report_handle = results.get("report_handle")
         
         st.markdown("---")
         
         # Gauge Chart
-        fig = go.Figure(go.Indicator(
-            mode="gauge+number",
-            value=FHI_rounded,
-            title={"text": "Your FHI Score"},
-            gauge={
-                'axis': {'range': [0, 100]},
-                'bar': {'color': "darkblue"},
-                'steps': [
-                    {'range': [0, 50], 'color': "salmon"},
-                    {'range': [50, 70], 'color': "gold"},
-                    {'range': [70, 100], 'color': "lightgreen"}
-                ]
-            }
-        ))
+        fig = fhi_gauge(FHI_rounded)
 
         # Update session state
         st.session_state["FHI"]               = float(FHI_rounded)
@@ -1139,17 +872,22 @@ if st.session_state.get('proceed'):
         st.session_state["emergency_fund"]    = float(emergency_fund)
 
 
-        # Save to database if user is signed in
-        if user_signed_in:
+        # Save to database if user is signed in, once per distinct set of inputs
+        save_key = (st.session_state.get("user_id"), results["input_key"])
+        if user_signed_in and st.session_state.get("fhi_saved_inputs") != save_key:
             try:
-                if save_user_financial_data():
+                saved = save_user_financial_data()
+                if saved is not False:
+                    # A save that went through (or had nothing to write) is remembered;
+                    # rate-limited or failed saves retry next run
+                    st.session_state["fhi_saved_inputs"] = save_key
+                if saved:
                     st.success("💾 Your financial data has been saved successfully!")
-                else:
+                elif saved is False:
                     st.warning("⚠️ Could not save your data, but calculation is complete.")
             except Exception as e:
                 st.warning(f"⚠️ Save failed: {str(e)}, but calculation is complete.")
 
-        fig.update_layout(height=300, margin=dict(t=20, b=20))
         score_col, text_col = st.columns([1, 2])
 
         with score_col:
@@ -1158,29 +896,7 @@ if st.session_state.get('proceed'):
         with text_col:
             st.markdown(f"### Overall FHI Score: *{FHI_rounded}/100*")
 
-            # Identify weak areas
-            weak_areas = []
-            if Nworth < 60:
-                weak_areas.append("net worth")
-            if DTI < 60:
-                weak_areas.append("debt-to-income ratio")
-            if Srate < 60:
-                weak_areas.append("savings rate")
-            if Invest < 60:
-                weak_areas.append("investment levels")
-            if Emerg < 60:
-                weak_areas.append("emergency fund")
-
-            # Construct weakness text
-            weak_text = ""
-            if weak_areas:
-                if len(weak_areas) == 1:
-                    weak_text = f" However, your {weak_areas[0]} needs improvement."
-                else:
-                    all_but_last = ", ".join(weak_areas[:-1])
-                    weak_text = f" However, your {all_but_last} and {weak_areas[-1]} need improvement."
-
-                weak_text += " Addressing this will help strengthen your overall financial health."
+            weak_text = results["weak_text"]
 
             # Final output based on FHI
             if FHI >= 85:
@@ -1194,7 +910,7 @@ if st.session_state.get('proceed'):
 
         # Component radar chart
         st.subheader("📈 FHI Breakdown")
-        radar_fig = create_component_radar_chart(components)
+        radar_fig = component_radar(tuple(components.items()))
         st.plotly_chart(radar_fig, use_container_width=True)
 
         # Component interpretations
@@ -1216,7 +932,7 @@ if st.session_state.get('proceed'):
                     # short help text under the header (Streamlit markdown has no `help` kwarg)
                     st.caption(component_descriptions.get(label, "Higher is better."))
         
-                    interpretation, suggestions = interpret(label, score)
+                    interpretation, suggestions = results["interpretations"][label]
                     st.markdown(
                         f"<span style='font-size:13px; color:#444;'>{interpretation}</span>",
                         unsafe_allow_html=True
@@ -1226,6 +942,19 @@ if st.session_state.get('proceed'):
                         for tip in suggestions:
                             st.write(f"- {tip}")
 
+        # Where an extra peso helps most, from the exact marginal effect of each input
+        st.subheader("🪙 Best Next Peso")
+        st.caption("FHI points gained for every ₱1,000 moved, based on your current numbers. "
+                   "Components already at their limit gain nothing.")
+        ranking = results["ranking"]
+        if ranking:
+            st.dataframe([
+                {"Rank": i + 1, "Action": label, "FHI Gain per ₱1,000": f"+{points:.2f}"}
+                for i, (_, label, points) in enumerate(ranking)
+            ], use_container_width=True, hide_index=True)
+        else:
+            st.success("Every component is already at its maximum.")
+
         # Peer comparison
         st.subheader("👥 How You Compare")
             
@@ -1272,34 +1001,9 @@ if st.session_state.get('proceed'):
                 )
         
         with col2:
-            # PDF Report
+            # PDF Report (rendered in the background as soon as the results are shown)
             if PDF_AVAILABLE:
-                if st.button("📄 Generate PDF Report", use_container_width=True):
-                    with st.spinner("Generating PDF report..."):
-                        try:
-                            pdf_data = generate_fynstra_pdf(
-                                FHI_rounded, 
-                                components, 
-                                {
-                                    "age": age,
-                                    "income": monthly_income,
-                                    "expenses": monthly_expenses,
-                                    "savings": monthly_savings,
-                                    "debt": monthly_debt,
-                                    "total_investments": total_investments,
-                                    "net_worth": net_worth,
-                                    "emergency_fund": emergency_fund
-                                }
-                            )
-                            st.download_button(
-                                label="⬇️ Download PDF Report",
-                                data=pdf_data,
-                                file_name=f"fynstra_report_{datetime.now().strftime('%Y%m%d')}.pdf",
-                                mime="application/pdf",
-                                use_container_width=True
-                            )
-                        except Exception as e:
-                            st.error(f"Failed to generate PDF: {e}")
+                pdf_report_download(report_handle, results)
             else:
                 st.button("📄 PDF Not Available", disabled=True, help="Install reportlab to enable PDF generation", use_container_width=True)
 
@@ -0,0 +1,203 @@
+"""Headless bulk generation of PDF reports for every user (e.g. monthly statements).
+
+Users are read from the "Users" worksheet (or a CSV export of it), scored in one
+vectorized pass, and rendered in parallel across a process pool. Finished reports
+are written as they arrive to a zip archive or a directory; at most a few reports
+per worker are in flight, so memory stays bounded however many users there are.
+
+Usage: python batch_reports.py --out reports.zip [--csv users.csv] [--workers 8] [--limit 1000]
+"""
+import argparse
+import csv
+import os
+import re
+import sys
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from fhi_engine import fhi_components, fhi_from_components
+
+USERS_SHEET = "Users"
+
+# Users sheet column -> report input
+INPUT_COLUMNS = {
+    "age": "age",
+    "monthly_income": "income",
+    "monthly_expenses": "expenses",
+    "monthly_savings": "savings",
+    "monthly_debt": "debt",
+    "total_investments": "total_investments",
+    "net_worth": "net_worth",
+    "emergency_fund": "emergency_fund",
+}
+
+IN_FLIGHT_PER_WORKER = 4
+
+# ===============================
+# INPUT
+# ===============================
+
+def rows_from_csv(path):
+    """Users rows from a CSV export of the Users worksheet"""
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+def rows_from_sheet():
+    """Users rows from the Google Sheet configured in .streamlit/secrets.toml"""
+    from storage import STORAGE_AVAILABLE, open_sheet, with_backoff
+
+    sh = open_sheet() if STORAGE_AVAILABLE else None
+    if not sh:
+        raise SystemExit("Google Sheets storage is not available; use --csv to read an export instead")
+    values = with_backoff(sh.worksheet(USERS_SHEET).get_all_values)
+    if not values:
+        return []
+    return [dict(zip(values[0], row)) for row in values[1:]]
+
+def _number(text):
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return 0.0
+
+def score_users(rows):
+    """Score every user at once; returns (user_ids, fhi, components, inputs) for scoreable users.
+
+    Users without income or expenses are skipped, as on the main page.
+    """
+    user_ids = np.array([row.get("user_id", "") for row in rows], dtype=object)
+    inputs = {field: np.array([_number(row.get(column)) for row in rows], dtype=float)
+              for column, field in INPUT_COLUMNS.items()}
+    inputs["age"] = np.floor(inputs["age"])
+
+    keep = (user_ids != "") & (inputs["income"] > 0) & (inputs["expenses"] > 0)
+    user_ids = user_ids[keep]
+    inputs = {field: values[keep] for field, values in inputs.items()}
+
+    components = fhi_components(inputs["age"], inputs["income"], inputs["expenses"], inputs["savings"],
+                                inputs["debt"], inputs["total_investments"], inputs["net_worth"],
+                                inputs["emergency_fund"])
+    fhi = np.round(fhi_from_components(components), 2)
+    return user_ids, fhi, components, inputs
+
+def report_jobs(user_ids, fhi, components, inputs):
+    """Yield one (user_id, fhi, components, user_inputs) job per scored user"""
+    for i, user_id in enumerate(user_ids):
+        user_inputs = {field: float(values[i]) for field, values in inputs.items()}
+        user_inputs["age"] = int(user_inputs["age"])
+        yield (user_id, float(fhi[i]), {name: float(scores[i]) for name, scores in components.items()},
+               user_inputs)
+
+# ===============================
+# RENDERING
+# ===============================
+
+def _render(job):
+    """Worker: render one report; returns (user_id, pdf bytes, render seconds, worker pid)"""
+    from pdf_reports import render_fynstra_pdf
+
+    user_id, fhi, components, user_inputs = job
+    start = time.perf_counter()
+    pdf_data = render_fynstra_pdf(fhi, components, user_inputs)
+    return user_id, pdf_data, time.perf_counter() - start, os.getpid()
+
+def report_filename(user_id):
+    return f"fynstra_report_{re.sub(r'[^A-Za-z0-9_.-]', '_', str(user_id))}.pdf"
+
+def _writer(out):
+    """Return (write(name, data), close()) for a .zip archive or a directory"""
+    if out.endswith(".zip"):
+        # PDF content streams are already compressed, so entries are stored as-is
+        archive = zipfile.ZipFile(out, "w", compression=zipfile.ZIP_STORED)
+        return archive.writestr, archive.close
+
+    os.makedirs(out, exist_ok=True)
+
+    def write(name, data):
+        with open(os.path.join(out, name), "wb") as f:
+            f.write(data)
+    return write, lambda: None
+
+def render_all(jobs, out, workers):
+    """Render jobs across a process pool, streaming each finished report to out.
+
+    Returns per-worker stats {pid: [reports, busy seconds]} and the failures.
+    """
+    write, close = _writer(out)
+    names = {}
+    worker_stats = {}
+    failures = []
+    max_in_flight = workers * IN_FLIGHT_PER_WORKER
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = {}
+            jobs = iter(jobs)
+            while True:
+                for job in jobs:
+                    pending[pool.submit(_render, job)] = job[0]
+                    if len(pending) >= max_in_flight:
+                        break
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    user_id = pending.pop(future)
+                    try:
+                        _, pdf_data, seconds, pid = future.result()
+                    except Exception as e:
+                        failures.append((user_id, str(e)))
+                        continue
+                    # Duplicate user_ids (or ids that sanitize alike) get numbered names instead of clashing
+                    name = report_filename(user_id)
+                    names[name] = names.get(name, 0) + 1
+                    if names[name] > 1:
+                        name = f"{name[:-len('.pdf')]}_{names[name]}.pdf"
+                    write(name, pdf_data)
+                    stats = worker_stats.setdefault(pid, [0, 0.0])
+                    stats[0] += 1
+                    stats[1] += seconds
+    finally:
+        close()
+    return worker_stats, failures
+
+# ===============================
+# CLI
+# ===============================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", required=True, help="output .zip archive or directory")
+    parser.add_argument("--csv", help="read users from a CSV export instead of the Google Sheet")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--limit", type=int, help="only render the first N scoreable users")
+    args = parser.parse_args()
+
+    rows = rows_from_csv(args.csv) if args.csv else rows_from_sheet()
+    start = time.perf_counter()
+    user_ids, fhi, components, inputs = score_users(rows)
+    if args.limit is not None:
+        user_ids = user_ids[:args.limit]
+    scored = time.perf_counter() - start
+    print(f"Scored {len(user_ids):,} of {len(rows):,} users in {scored * 1000:.1f} ms")
+
+    start = time.perf_counter()
+    worker_stats, failures = render_all(report_jobs(user_ids, fhi, components, inputs), args.out, args.workers)
+    elapsed = time.perf_counter() - start
+    rendered = sum(count for count, _ in worker_stats.values())
+    cores = min(args.workers, os.cpu_count() or 1)
+
+    print(f"Rendered {rendered:,} reports to {args.out} in {elapsed:.2f} s "
+          f"({rendered / elapsed:,.1f} reports/sec, {rendered / elapsed / cores:,.1f} per core "
+          f"with {args.workers} workers on {cores} cores)")
+    print(f"{'worker pid':>10}{'reports':>10}{'busy s':>10}{'reports/sec':>14}")
+    for pid, (count, busy) in sorted(worker_stats.items()):
+        print(f"{pid:>10}{count:>10,}{busy:>10.2f}{count / busy if busy else 0.0:>14,.1f}")
+    for user_id, error in failures:
+        print(f"Failed to render report for {user_id}: {error}", file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
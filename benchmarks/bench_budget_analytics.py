@@ -0,0 +1,67 @@
+"""Throughput benchmark for the Budget Tracker rollups and anomaly detector.
+
+Usage: python benchmarks/bench_budget_analytics.py [--entries 10000 100000 1000000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from budget_analytics import (  # noqa: E402
+    apply_entry, build_anomaly_state, build_rollups, empty_anomaly_state, empty_rollups, score_entry,
+)
+
+CATEGORIES = ["Food", "Transportation", "Bills", "Shopping", "Entertainment", "Health", "Savings", "Others"]
+
+def make_ledger(n, seed=0):
+    """Synthetic multi-year ledger with log-normal amounts"""
+    rnd = random.Random(seed)
+    start = date(2015, 1, 1)
+    return [
+        {
+            "date": start + timedelta(days=rnd.randrange(3650)),
+            "type": "Income" if rnd.random() < 0.2 else "Expense",
+            "category": rnd.choice(CATEGORIES),
+            "amount": round(rnd.lognormvariate(6.5, 1.0), 2),
+        }
+        for _ in range(n)
+    ]
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+def streaming_rollups(entries):
+    rollups = empty_rollups()
+    for entry in entries:
+        apply_entry(rollups, entry)
+
+def streaming_anomalies(entries):
+    state = empty_anomaly_state()
+    for i, entry in enumerate(entries):
+        score_entry(state, i, entry)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'entries':>10}  {'step':<28}{'seconds':>10}{'entries/sec':>16}")
+    for n in args.entries:
+        entries = make_ledger(n)
+        for name, fn in [
+            ("rollups, bulk build", lambda: build_rollups(entries)),
+            ("rollups, per-entry append", lambda: streaming_rollups(entries)),
+            ("anomalies, bulk pass", lambda: build_anomaly_state(entries)),
+            ("anomalies, per-entry append", lambda: streaming_anomalies(entries)),
+        ]:
+            seconds = timed(fn)
+            print(f"{n:>10,}  {name:<28}{seconds:>10.3f}{n / seconds:>16,.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Per-report render time for the PDF report, with and without the shared styles and assets.
+
+"rebuilt per report" clears the per-process style, palette and static-asset caches
+before every render, which is what every report paid before they were shared.
+
+Usage: python benchmarks/bench_pdf_render.py [--reports 200]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fhi_engine import calculate_fhi  # noqa: E402
+from pdf_reports import (  # noqa: E402
+    _static_pdf_assets, create_component_chart, create_data_table, create_fhi_score_banner, create_pdf_styles,
+    pdf_palette, render_fynstra_pdf,
+)
+
+def make_reports(n, seed=0):
+    """Synthetic (FHI, components, user_inputs) triples"""
+    rnd = random.Random(seed)
+    reports = []
+    for _ in range(n):
+        income = rnd.uniform(15_000, 200_000)
+        inputs = {
+            "age": rnd.randint(20, 65),
+            "income": income,
+            "expenses": income * rnd.uniform(0.4, 1.1),
+            "savings": income * rnd.uniform(0.0, 0.3),
+            "debt": income * rnd.uniform(0.0, 0.4),
+            "total_investments": income * rnd.uniform(0, 60),
+            "net_worth": income * rnd.uniform(-5, 100),
+            "emergency_fund": income * rnd.uniform(0, 8),
+        }
+        fhi, components = calculate_fhi(
+            inputs["age"], inputs["income"], inputs["expenses"], inputs["savings"], inputs["debt"],
+            inputs["total_investments"], inputs["net_worth"], inputs["emergency_fund"])
+        reports.append((round(fhi, 2), components, inputs))
+    return reports
+
+def clear_shared_assets():
+    for cached in (create_pdf_styles, pdf_palette, _static_pdf_assets):
+        cached.clear()
+
+def per_report_ms(reports, fn, before=None):
+    total = 0.0
+    for report in reports:
+        if before:
+            before()
+        start = time.perf_counter()
+        fn(*report)
+        total += time.perf_counter() - start
+    return 1000 * total / len(reports)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reports", type=int, default=200)
+    args = parser.parse_args()
+
+    reports = make_reports(args.reports)
+    render_fynstra_pdf(*reports[0])  # warm up fonts and imports
+
+    def assets(fhi, components, inputs):
+        create_pdf_styles()
+        create_fhi_score_banner(fhi)
+        create_component_chart(components)
+        create_data_table([[name, f"{score:.1f}/100"] for name, score in components.items()])
+
+    print(f"{'step':<34}{'rebuilt per report':>20}{'shared':>12}")
+    for name, fn in [("styles, banner, chart and table", assets), ("full report render", render_fynstra_pdf)]:
+        cold = per_report_ms(reports, fn, before=clear_shared_assets)
+        warm = per_report_ms(reports, fn)
+        print(f"{name:<34}{cold:>17.3f} ms{warm:>9.3f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+"""Budget ledger rollups and trend analytics for the Budget Tracker"""
+import math
+
+import numpy as np
+import pandas as pd
+
+from month_calendar import month_index, month_label
+
+ENTRY_TYPES = ("Income", "Expense")
+
+# Anomaly detector settings
+EWMA_ALPHA = 0.1          # weight of the newest entry in a category's running mean
+EWMA_WARMUP = 5           # entries a category needs before it can be flagged
+EWMA_Z_THRESHOLD = 3.0
+ROBUST_Z_THRESHOLD = 3.5  # modified z-score cut-off (Iglewicz & Hoaglin)
+
+# ===============================
+# ROLLUP CUBE (month × category × type)
+# ===============================
+
+def empty_rollups():
+    """Return an empty rollup cube"""
+    return {"version": 0, "cells": {}}
+
+def apply_entry(rollups, entry, sign=1):
+    """Add (sign=1) or remove (sign=-1) a single ledger entry from the rollups in place"""
+    key = (month_index(entry["date"]), entry["category"], entry["type"])
+    total, count = rollups["cells"].get(key, (0.0, 0))
+    total += sign * float(entry["amount"])
+    count += sign
+    if count <= 0:
+        rollups["cells"].pop(key, None)
+    else:
+        rollups["cells"][key] = (total, count)
+    rollups["version"] += 1
+    return rollups
+
+def build_rollups(entries, version=0):
+    """Build the rollup cube for a whole ledger in one grouped pass"""
+    rollups = {"version": version, "cells": {}}
+    if not entries:
+        return rollups
+
+    df = pd.DataFrame(entries, columns=["date", "type", "category", "amount"])
+    dates = pd.to_datetime(df["date"])
+    df["month"] = dates.dt.year * 12 + dates.dt.month - 1
+    grouped = df.groupby(["month", "category", "type"])["amount"].agg(["sum", "count"])
+
+    rollups["cells"] = {
+        (int(m), c, t): (float(s), int(n))
+        for (m, c, t), s, n in zip(grouped.index, grouped["sum"], grouped["count"])
+    }
+    return rollups
+
+def cached_view(cache, name, rollups, compute):
+    """Return compute(rollups), reusing the cached value while the rollup version is unchanged"""
+    hit = cache.get(name)
+    if hit is not None and hit[0] == rollups["version"]:
+        return hit[1]
+    value = compute(rollups)
+    cache[name] = (rollups["version"], value)
+    return value
+
+# ===============================
+# ROLLUP VIEWS
+# ===============================
+
+def _month_range(rollups):
+    months = [k[0] for k in rollups["cells"]]
+    if not months:
+        return np.arange(0)
+    return np.arange(min(months), max(months) + 1)
+
+def monthly_matrix(rollups, entry_type):
+    """Return a months × categories DataFrame of totals for one entry type, with every month present"""
+    months = _month_range(rollups)
+    cells = [(m, c, v[0]) for (m, c, t), v in rollups["cells"].items() if t == entry_type]
+    labels = [month_label(m) for m in months]
+
+    if not cells:
+        return pd.DataFrame(index=pd.Index(labels, name="month"))
+
+    frame = pd.DataFrame(cells, columns=["month", "category", "amount"])
+    matrix = frame.pivot_table(index="month", columns="category", values="amount", aggfunc="sum")
+    matrix = matrix.reindex(months, fill_value=0.0).fillna(0.0)
+    matrix.index = pd.Index(labels, name="month")
+    matrix.columns.name = None
+    return matrix
+
+def monthly_totals(rollups):
+    """Return Income, Expense and Net totals per month"""
+    months = _month_range(rollups)
+    offset = months[0] if len(months) else 0
+    totals = np.zeros((len(months), len(ENTRY_TYPES)))
+
+    for (m, _, t), (amount, _) in rollups["cells"].items():
+        totals[m - offset, ENTRY_TYPES.index(t)] += amount
+
+    frame = pd.DataFrame(
+        totals,
+        index=pd.Index([month_label(m) for m in months], name="month"),
+        columns=list(ENTRY_TYPES),
+    )
+    frame["Net"] = frame["Income"] - frame["Expense"]
+    return frame
+
+def month_over_month(monthly):
+    """Return the month-over-month % change of each monthly total"""
+    prev = monthly.shift(1)
+    change = (monthly - prev) / prev.abs() * 100
+    return change.replace([np.inf, -np.inf], np.nan)
+
+def rolling_averages(monthly, windows=(3, 6, 12)):
+    """Return trailing rolling means of the monthly totals for each window size"""
+    return {w: monthly.rolling(window=w, min_periods=1).mean() for w in windows}
+
+def category_share(rollups, entry_type="Expense"):
+    """Return each category's share (%) of the month's total for one entry type"""
+    matrix = monthly_matrix(rollups, entry_type)
+    totals = matrix.sum(axis=1).replace(0, np.nan)
+    return matrix.div(totals, axis=0).mul(100).fillna(0.0)
+
+# ===============================
+# FHI INPUT AGGREGATION
+# ===============================
+
+def trailing_actuals(rollups, months=3, savings_category="Savings"):
+    """Average monthly income, living expenses and savings over the last N ledger months (or fewer, if the ledger is shorter)"""
+    if not rollups["cells"]:
+        return None
+
+    month_indices = [k[0] for k in rollups["cells"]]
+    latest = max(month_indices)
+    # A ledger younger than the window is averaged over the months it actually covers
+    months = min(months, latest - min(month_indices) + 1)
+    first = latest - months + 1
+    income = expenses = 0.0
+
+    for (m, category, entry_type), (amount, _) in rollups["cells"].items():
+        if m < first:
+            continue
+        if entry_type == "Income":
+            income += amount
+        # Money moved into the Savings category is saved, not spent
+        elif category != savings_category:
+            expenses += amount
+
+    income, expenses = income / months, expenses / months
+    return {
+        "months": months,
+        "from": month_label(first),
+        "through": month_label(latest),
+        "income": income,
+        "expenses": expenses,
+        "savings": max(income - expenses, 0.0),
+    }
+
+# ===============================
+# SPENDING ANOMALY DETECTION
+# ===============================
+# Entry level: each expense is scored against an exponentially weighted mean and
+# variance of earlier expenses in its category. The state per category is
+# (count, EWMA of x, EWMA of x²), so appending an entry is O(1) and a whole
+# ledger can be scored in one grouped pass with identical results.
+
+def empty_anomaly_state():
+    """Return an empty streaming anomaly detector state"""
+    return {"categories": {}, "alerts": []}
+
+def _alert(index, entry, expected, z):
+    return {
+        "index": index,
+        "date": entry["date"],
+        "category": entry["category"],
+        "amount": float(entry["amount"]),
+        "expected": float(expected),
+        "z": float(z),
+    }
+
+def score_entry(state, index, entry, alpha=EWMA_ALPHA, warmup=EWMA_WARMUP, threshold=EWMA_Z_THRESHOLD):
+    """Score one appended ledger entry against its category's EWMA, then fold it in"""
+    if entry["type"] != "Expense":
+        return None
+
+    x = float(entry["amount"])
+    count, m1, m2 = state["categories"].get(entry["category"], (0, 0.0, 0.0))
+
+    alert = None
+    if count >= warmup:
+        std = math.sqrt(max(m2 - m1 * m1, 0.0))
+        if std > 0 and (x - m1) / std > threshold:
+            alert = _alert(index, entry, m1, (x - m1) / std)
+            state["alerts"].append(alert)
+
+    if count == 0:
+        m1, m2 = x, x * x
+    else:
+        m1 += alpha * (x - m1)
+        m2 += alpha * (x * x - m2)
+    state["categories"][entry["category"]] = (count + 1, m1, m2)
+    return alert
+
+def build_anomaly_state(entries, alpha=EWMA_ALPHA, warmup=EWMA_WARMUP, threshold=EWMA_Z_THRESHOLD):
+    """Score a whole ledger in one vectorized pass, matching score_entry applied entry by entry"""
+    state = empty_anomaly_state()
+    rows = [i for i, e in enumerate(entries) if e["type"] == "Expense"]
+    if not rows:
+        return state
+
+    codes, categories = pd.factorize(pd.Series([entries[i]["category"] for i in rows]))
+    x = pd.Series([float(entries[i]["amount"]) for i in rows], index=rows)
+    by_cat = pd.Series(codes, index=rows)
+    ewm = lambda s: (s.groupby(by_cat).ewm(alpha=alpha, adjust=False).mean()
+                     .reset_index(level=0, drop=True).reindex(s.index))
+    m1, m2 = ewm(x), ewm(x * x)
+
+    # Score each entry against the state *before* it was folded in
+    prev_m1 = m1.groupby(by_cat).shift(1)
+    prev_m2 = m2.groupby(by_cat).shift(1)
+    count = x.groupby(by_cat).cumcount()
+    std = np.sqrt((prev_m2 - prev_m1 ** 2).clip(lower=0.0))
+    z = (x - prev_m1) / std.where(std > 0)
+    hits = ((count >= warmup) & (z > threshold)).to_numpy()
+
+    for row, expected, score in zip(x.index[hits], prev_m1.to_numpy()[hits], z.to_numpy()[hits]):
+        state["alerts"].append(_alert(int(row), entries[row], expected, score))
+
+    last = by_cat.groupby(by_cat).tail(1).index
+    state["categories"] = {
+        categories[by_cat[row]]: (int(count[row]) + 1, float(m1[row]), float(m2[row])) for row in last
+    }
+    return state
+
+def monthly_spend_outliers(rollups, threshold=ROBUST_Z_THRESHOLD, min_months=4):
+    """Flag category-months whose spend is far above that category's median (robust z-score)"""
+    matrix = monthly_matrix(rollups, "Expense")
+    columns = ["month", "category", "amount", "median", "z"]
+    if len(matrix) < min_months or matrix.columns.empty:
+        return pd.DataFrame(columns=columns)
+
+    values = matrix.to_numpy()
+    median = np.median(values, axis=0)
+    mad = np.median(np.abs(values - median), axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.where(mad > 0, 0.6745 * (values - median) / mad, 0.0)
+
+    rows, cols = np.nonzero(z > threshold)
+    return pd.DataFrame({
+        "month": matrix.index[rows],
+        "category": matrix.columns[cols],
+        "amount": values[rows, cols],
+        "median": median[cols],
+        "z": z[rows, cols],
+    }, columns=columns)
+
+# ===============================
+# CASH-FLOW FORECASTING
+# ===============================
+
+FORECAST_METHODS = ("Holt-Winters", "Seasonal naive")
+
+def holt_winters(series, horizon, season=12, alpha=0.4, beta=0.1, gamma=0.3):
+    """Additive Holt-Winters forecast for many series at once (rows = series, columns = months)"""
+    series = np.asarray(series, dtype=float)
+    n_series, n_months = series.shape
+
+    if n_months == 0:
+        return np.zeros((n_series, horizon))
+    if n_months < 2:
+        return np.repeat(series[:, -1:], horizon, axis=1)
+
+    # Seasonality needs two full seasons to initialise; otherwise fall back to Holt's linear trend
+    seasonal_fit = n_months >= 2 * season
+    if seasonal_fit:
+        level = series[:, :season].mean(axis=1)
+        trend = (series[:, season:2 * season].mean(axis=1) - level) / season
+        offsets = np.arange(season) - (season - 1) / 2
+        seasonal = series[:, :season] - level[:, None] - trend[:, None] * offsets
+        # The first-season mean sits mid-season; step it back to just before month 0
+        level = level - trend * (season + 1) / 2
+    else:
+        trend = series[:, 1] - series[:, 0]
+        level = series[:, 0] - trend
+        seasonal = np.zeros((n_series, season))
+
+    for t in range(n_months):
+        s = seasonal[:, t % season]
+        prev_level = level
+        level = alpha * (series[:, t] - s) + (1 - alpha) * (level + trend)
+        trend = beta * (level - prev_level) + (1 - beta) * trend
+        if seasonal_fit:
+            seasonal[:, t % season] = gamma * (series[:, t] - level) + (1 - gamma) * s
+
+    steps = np.arange(1, horizon + 1)
+    season_idx = (n_months + steps - 1) % season
+    return level[:, None] + trend[:, None] * steps + seasonal[:, season_idx]
+
+def seasonal_naive(series, horizon, season=12):
+    """Repeat the same month of the last season (or the last value if history is shorter)"""
+    series = np.asarray(series, dtype=float)
+    n_series, n_months = series.shape
+    if n_months == 0:
+        return np.zeros((n_series, horizon))
+    if n_months < season:
+        return np.repeat(series[:, -1:], horizon, axis=1)
+    steps = np.arange(horizon)
+    return series[:, n_months - season + steps % season]
+
+def forecast_cashflow(rollups, horizon=6, method="Holt-Winters"):
+    """Project the next N months of income and expenses per category, plus totals"""
+    matrices = {t: monthly_matrix(rollups, t) for t in ENTRY_TYPES}
+    columns = [(t, c) for t in ENTRY_TYPES for c in matrices[t].columns]
+    months = _month_range(rollups)
+    future = [month_label(m) for m in range(int(months[-1]) + 1, int(months[-1]) + 1 + horizon)] if len(months) else []
+
+    if not columns:
+        by_category = pd.DataFrame(index=pd.Index(future, name="month"),
+                                   columns=pd.MultiIndex.from_tuples([], names=["type", "category"]))
+    else:
+        history = np.vstack([matrices[t][c].to_numpy() for t, c in columns])
+        model = holt_winters if method == "Holt-Winters" else seasonal_naive
+        projected = np.clip(model(history, horizon), 0.0, None)
+        by_category = pd.DataFrame(projected.T, index=pd.Index(future, name="month"),
+                                   columns=pd.MultiIndex.from_tuples(columns, names=["type", "category"]))
+
+    totals = pd.DataFrame(index=by_category.index)
+    for t in ENTRY_TYPES:
+        totals[t] = by_category[t].sum(axis=1) if t in by_category.columns.get_level_values(0) else 0.0
+    totals["Net"] = totals["Income"] - totals["Expense"]
+    return {"by_category": by_category, "totals": totals}
@@ -0,0 +1,495 @@
+"""Vectorized Financial Health Index (FHI) calculations shared by the main page and the What-if Sandbox"""
+import hashlib
+import json
+
+import numpy as np
+
+FHI_WEIGHTS = {
+    "Net Worth": 0.20,
+    "Debt-to-Income": 0.15,
+    "Savings Rate": 0.15,
+    "Investment": 0.15,
+    "Emergency Fund": 0.20,
+}
+FHI_BASE = 15.0
+
+# Scenario levers: percentage changes applied to the user's current profile,
+# with the ranges offered by the What-if Sandbox sliders
+SCENARIO_LEVERS = {
+    "income_pct": ("Income Change (%)", -100, 50),
+    "expenses_pct": ("Expenses Change (%)", -30, 30),
+    "savings_pct": ("Savings Change (%)", -100, 50),
+    "debt_pct": ("Debt Payments Change (%)", -30, 50),
+    "invest_pct": ("Investment Growth (%)", -30, 50),
+    "efund_pct": ("Emergency Fund Change (%)", -30, 50),
+}
+
+# The profile input each lever scales
+LEVER_INPUTS = {
+    "income_pct": "income",
+    "expenses_pct": "expenses",
+    "savings_pct": "savings",
+    "debt_pct": "debt",
+    "invest_pct": "total_investments",
+    "efund_pct": "emergency_fund",
+}
+
+# ===============================
+# FHI KERNEL
+# ===============================
+
+def age_targets(age):
+    """Return the (net worth, investment) multiples of annual income expected at an age"""
+    age = np.asarray(age)
+    alpha = np.select([age < 30, age < 40, age < 50], [2.5, 3.0, 3.5], 4.0)
+    beta = np.select([age < 30, age < 40, age < 50], [2.0, 3.0, 4.0], 5.0)
+    return alpha, beta
+
+def _ratio(numerator, denominator):
+    """numerator / denominator, or 0 where the denominator is not positive"""
+    denominator = np.asarray(denominator, dtype=float)
+    safe = np.where(denominator > 0, denominator, 1.0)
+    return np.where(denominator > 0, np.asarray(numerator, dtype=float) / safe, 0.0)
+
+def fhi_components(age, monthly_income, monthly_expenses, monthly_savings, monthly_debt,
+                   total_investments, net_worth, emergency_fund):
+    """Return the five FHI component scores (0-100) for any broadcastable array inputs"""
+    alpha, beta = age_targets(age)
+    annual_income = np.asarray(monthly_income, dtype=float) * 12
+    has_income = annual_income > 0
+
+    return {
+        "Net Worth": np.clip(_ratio(net_worth, annual_income * alpha) * 100, 0, 100),
+        "Debt-to-Income": np.where(has_income, 100 - np.minimum(_ratio(monthly_debt, monthly_income) * 100, 100), 0.0),
+        "Savings Rate": np.minimum(_ratio(monthly_savings, monthly_income) * 100, 100),
+        "Investment": np.clip(_ratio(total_investments, beta * annual_income) * 100, 0, 100),
+        "Emergency Fund": np.minimum(_ratio(emergency_fund, monthly_expenses) / 6 * 100, 100),
+    }
+
+def fhi_from_components(components):
+    """Weighted FHI score from component scores (scalars or arrays)"""
+    return sum(FHI_WEIGHTS[name] * score for name, score in components.items()) + FHI_BASE
+
+def calculate_fhi(age, monthly_income, monthly_expenses, monthly_savings, monthly_debt,
+                  total_investments, net_worth, emergency_fund):
+    """Calculate FHI score and components for a single profile"""
+    components = {
+        name: float(score) for name, score in fhi_components(
+            age, monthly_income, monthly_expenses, monthly_savings, monthly_debt,
+            total_investments, net_worth, emergency_fund).items()
+    }
+    return fhi_from_components(components), components
+
+# ===============================
+# SCENARIOS
+# ===============================
+
+def apply_scenario(profile, income_pct=0, expenses_pct=0, savings_pct=0, debt_pct=0, invest_pct=0, efund_pct=0,
+                   savings_abs_delta=0, debt_abs_delta=0):
+    """Apply lever changes to a profile; levers may be arrays, giving one scenario per element.
+
+    ``profile`` has the keys of ``fhi_results["user_inputs"]`` (age, income, expenses,
+    savings, debt, total_investments, net_worth, emergency_fund).
+    """
+    return {
+        "age": profile["age"],
+        "income": np.maximum(0.0, profile["income"] * (1 + np.asarray(income_pct) / 100)),
+        "expenses": np.maximum(0.0, profile["expenses"] * (1 + np.asarray(expenses_pct) / 100)),
+        "savings": np.maximum(0.0, profile["savings"] * (1 + np.asarray(savings_pct) / 100) + savings_abs_delta),
+        "debt": np.maximum(0.0, profile["debt"] * (1 + np.asarray(debt_pct) / 100) + debt_abs_delta),
+        "total_investments": np.maximum(0.0, profile["total_investments"] * (1 + np.asarray(invest_pct) / 100)),
+        "net_worth": profile["net_worth"],
+        "emergency_fund": np.maximum(0.0, profile["emergency_fund"] * (1 + np.asarray(efund_pct) / 100)),
+    }
+
+# Everything that defines a saved scenario
+SCENARIO_PARAMS = tuple(SCENARIO_LEVERS) + ("savings_abs_delta", "debt_abs_delta")
+
+def scenario_id(params):
+    """Stable short ID for a scenario: the same parameters always get the same ID"""
+    canonical = json.dumps({k: float(params.get(k, 0)) for k in SCENARIO_PARAMS}, sort_keys=True)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:10]
+
+def evaluate_scenarios(profile, param_sets):
+    """Score many scenarios in one vectorized pass.
+
+    ``param_sets`` is a list of parameter dicts (keys from SCENARIO_PARAMS). Returns
+    the scenario profiles, FHI and components as arrays with one entry per scenario.
+    """
+    levers = {k: np.array([float(p.get(k, 0)) for p in param_sets]) for k in SCENARIO_PARAMS}
+    scenarios = apply_scenario(profile, **levers)
+    fhi, components = profile_fhi(scenarios)
+    return {"values": scenarios, "fhi": np.broadcast_to(fhi, (len(param_sets),)), "components": components}
+
+def profile_fhi(profile):
+    """Return (FHI, components) for a profile dict whose values may be arrays"""
+    components = fhi_components(profile["age"], profile["income"], profile["expenses"], profile["savings"],
+                                profile["debt"], profile["total_investments"], profile["net_worth"],
+                                profile["emergency_fund"])
+    return fhi_from_components(components), components
+
+def sweep_fhi(profile, x_lever, x_values, y_lever, y_values, **levers):
+    """Evaluate FHI over a grid of two levers, holding the other levers fixed.
+
+    Returns an array of shape (len(y_values), len(x_values)), in one vectorized pass.
+    """
+    grid = dict(levers)
+    grid[x_lever] = np.asarray(x_values, dtype=float)[np.newaxis, :]
+    grid[y_lever] = np.asarray(y_values, dtype=float)[:, np.newaxis]
+    fhi, _ = profile_fhi(apply_scenario(profile, **grid))
+    return np.broadcast_to(fhi, (len(y_values), len(x_values)))
+
+# ===============================
+# GOAL SEEK
+# ===============================
+
+# Levers that each move a single component, so their effects add up independently
+SEPARABLE_LEVERS = ("savings_pct", "debt_pct", "invest_pct", "efund_pct")
+
+def _lever_lines(profile, lever):
+    """Describe how one lever moves FHI as clipped lines in a transformed variable t.
+
+    Returns (base, transform, lines): ``t = transform(base * (1 + pct / 100))`` and
+    every affected component equals ``clip(a * t + b, lo, hi)``, with lines mapping
+    component name -> (a, b, lo, hi). Income and expenses enter the formula as
+    divisors, so for those levers t is the reciprocal and FHI is piecewise linear in t.
+    """
+    alpha, beta = (float(x) for x in age_targets(profile["age"]))
+    income, expenses = profile["income"], profile["expenses"]
+    if lever == "income_pct":
+        return income, np.reciprocal, {
+            "Net Worth": (100 * profile["net_worth"] / (12 * alpha), 0.0, 0.0, 100.0),
+            "Debt-to-Income": (-100 * profile["debt"], 100.0, 0.0, np.inf),
+            "Savings Rate": (100 * profile["savings"], 0.0, -np.inf, 100.0),
+            "Investment": (100 * profile["total_investments"] / (12 * beta), 0.0, 0.0, 100.0),
+        }
+    if lever == "expenses_pct":
+        return expenses, np.reciprocal, {"Emergency Fund": (100 * profile["emergency_fund"] / 6, 0.0, -np.inf, 100.0)}
+
+    identity = np.asarray
+    if lever == "savings_pct":
+        return profile["savings"], identity, {"Savings Rate": (100 / income, 0.0, -np.inf, 100.0)}
+    if lever == "debt_pct":
+        return profile["debt"], identity, {"Debt-to-Income": (-100 / income, 100.0, 0.0, np.inf)}
+    if lever == "invest_pct":
+        return profile["total_investments"], identity, {"Investment": (100 / (12 * beta * income), 0.0, 0.0, 100.0)}
+    if lever == "efund_pct":
+        return profile["emergency_fund"], identity, {"Emergency Fund": (100 / (6 * expenses), 0.0, -np.inf, 100.0)}
+    raise ValueError(f"Unknown lever: {lever}")
+
+def solve_lever(profile, lever, target, bounds=None):
+    """Find the smallest change of one lever that lifts FHI to the target, exactly.
+
+    FHI is piecewise linear in the lever's transformed variable, so it is evaluated
+    only at the range ends and the clip breakpoints, and each crossing of the target
+    is solved on its linear piece. Returns {"pct": change or None if unreachable,
+    "fhi": FHI at that change, "max_fhi": best FHI reachable within bounds}.
+    """
+    lo_pct, hi_pct = bounds or SCENARIO_LEVERS[lever][1:]
+    current_fhi, current_components = profile_fhi(profile)
+    current_fhi = float(current_fhi)
+    base, transform, lines = _lever_lines(profile, lever)
+    if transform is np.reciprocal:
+        # Income or expenses of zero would put t at infinity
+        lo_pct = max(lo_pct, -99.0)
+    if base <= 0 or profile["income"] <= 0 or profile["expenses"] <= 0:
+        return {"pct": 0.0 if current_fhi >= target else None, "fhi": current_fhi, "max_fhi": current_fhi}
+
+    fixed = FHI_BASE + sum(FHI_WEIGHTS[k] * float(v) for k, v in current_components.items() if k not in lines)
+
+    def fhi_at(t):
+        return fixed + sum(FHI_WEIGHTS[k] * np.clip(a * t + b, lo, hi) for k, (a, b, lo, hi) in lines.items())
+
+    def pct_of(t):
+        return (transform(t) / base - 1) * 100
+
+    t_ends = transform(base * (1 + np.array([lo_pct, hi_pct]) / 100))
+    t_min, t_max = t_ends.min(), t_ends.max()
+    breaks = [(edge - b) / a for a, b, lo, hi in lines.values() if a for edge in (lo, hi) if np.isfinite(edge)]
+    ts = np.unique(np.clip(np.concatenate([t_ends, breaks]), t_min, t_max))
+    values = fhi_at(ts)
+    max_fhi = float(values.max())
+
+    if current_fhi >= target:
+        return {"pct": 0.0, "fhi": current_fhi, "max_fhi": max_fhi}
+
+    # Target crossings on each linear piece; keep the one closest to no change
+    f0, f1 = values[:-1], values[1:]
+    crossing = ((f0 - target) * (f1 - target) <= 0) & (f0 != f1)
+    if not crossing.any():
+        return {"pct": None, "fhi": max_fhi, "max_fhi": max_fhi}
+    t0, t1 = ts[:-1][crossing], ts[1:][crossing]
+    t_hit = t0 + (target - f0[crossing]) * (t1 - t0) / (f1[crossing] - f0[crossing])
+    pcts = pct_of(t_hit)
+    best = pcts[np.argmin(np.abs(pcts))]
+    return {"pct": float(best), "fhi": float(target), "max_fhi": max_fhi}
+
+def goal_seek(profile, target, bounds=None):
+    """Solve every lever independently for a target FHI; returns lever -> solve_lever result"""
+    bounds = bounds or {}
+    return {lever: solve_lever(profile, lever, target, bounds.get(lever)) for lever in SCENARIO_LEVERS}
+
+def _fill_levers(levers, needed):
+    """Fractional knapsack: spend points on levers in order of FHI gained per point"""
+    used = {}
+    for slope, lever, points in sorted(levers, reverse=True):
+        if needed <= 0:
+            break
+        used[lever] = min(points, needed / slope)
+        needed -= used[lever] * slope
+    return used, needed
+
+def cheapest_mix(profile, target, max_changes):
+    """Reach a target FHI with the fewest total percentage points of change across separable levers.
+
+    Each separable lever raises one component linearly until that component's
+    clip (or the user's limit in ``max_changes``, in percentage points), so the
+    linear program is a fractional knapsack: fill levers in order of FHI gained
+    per point. A component already clamped at its floor (e.g. debt payments above
+    income) first needs a stretch of change that gains nothing; each subset of such
+    levers is tried with that fixed cost paid up front. Returns {"changes": lever ->
+    signed pct, "fhi": resulting FHI, "feasible": bool}.
+    """
+    current_fhi = float(profile_fhi(profile)[0])
+    linear, dead_zone = [], []
+    for lever in SEPARABLE_LEVERS:
+        base, _, lines = _lever_lines(profile, lever)
+        (name, (a, b, lo, hi)), = lines.items()
+        if base <= 0 or a == 0 or profile["income"] <= 0 or profile["expenses"] <= 0:
+            continue
+        direction = 1.0 if a > 0 else -1.0
+        slope = FHI_WEIGHTS[name] * abs(a) * base / 100          # FHI points per percentage point
+        raw = a * base + b                                       # component before clipping
+        dead = max(lo - raw, 0.0) / (abs(a) * base) * 100        # points spent getting off the floor
+        # Component points left before the clip (or, for debt, before it reaches zero)
+        room = (hi if a > 0 else min(hi, b)) - max(raw, lo)
+        limit = max_changes.get(lever, abs(SCENARIO_LEVERS[lever][1 if direction < 0 else 2]))
+        points = min(max(room, 0.0) * FHI_WEIGHTS[name] / slope, limit - dead)
+        if points <= 0:
+            continue
+        (dead_zone if dead > 0 else linear).append((slope, lever, direction, points, dead))
+
+    directions = {lever: direction for _, lever, direction, _, _ in linear + dead_zone}
+    best = None
+    for mask in range(1 << len(dead_zone)):
+        chosen = [lever for i, lever in enumerate(dead_zone) if mask >> i & 1]
+        used, needed = _fill_levers([(slope, lever, points) for slope, lever, _, points, _ in linear + chosen],
+                                    target - current_fhi)
+        for _, lever, _, _, dead in chosen:
+            used[lever] = used.get(lever, 0.0) + dead
+        # Prefer reaching the target, then the smallest total change (or the largest gain if unreachable)
+        rank = (needed > 1e-9, max(needed, 0.0) if needed > 1e-9 else sum(used.values()))
+        if best is None or rank < best[0]:
+            best = (rank, used)
+
+    changes = {lever: 0.0 for lever in SEPARABLE_LEVERS}
+    if target > current_fhi and best is not None:
+        changes.update({lever: directions[lever] * points for lever, points in best[1].items()})
+    fhi = float(profile_fhi(apply_scenario(profile, **changes))[0])
+    return {"changes": changes, "fhi": fhi, "feasible": fhi >= target - 1e-6}
+
+# ===============================
+# SENSITIVITY
+# ===============================
+
+# Profile inputs a user can move, the helpful direction for each, and how to phrase it
+MARGINAL_ACTIONS = {
+    "income": (+1, "Earn more each month"),
+    "expenses": (-1, "Spend less each month"),
+    "savings": (+1, "Save more each month"),
+    "debt": (-1, "Pay less toward debt each month"),
+    "total_investments": (+1, "Invest more"),
+    "emergency_fund": (+1, "Add to your emergency fund"),
+    "net_worth": (+1, "Grow your net worth"),
+}
+
+def fhi_sensitivity(profile):
+    """Return the exact FHI change per peso moved in each input's helpful direction.
+
+    Each input maps to (direction, gain), where gain is the one-sided derivative
+    of FHI for moving that input one peso in ``MARGINAL_ACTIONS`` direction. A
+    component that is clamped (at 0 or 100) and would stay clamped contributes
+    nothing. Profile values may be arrays; gains broadcast accordingly.
+    """
+    alpha, beta = age_targets(profile["age"])
+    income = np.asarray(profile["income"], dtype=float)
+    expenses = np.asarray(profile["expenses"], dtype=float)
+    safe_income = np.where(income > 0, income, 1.0)
+    safe_expenses = np.where(expenses > 0, expenses, 1.0)
+    has_income, has_expenses = income > 0, expenses > 0
+
+    # Unclipped component ratios
+    nw = _ratio(profile["net_worth"], 12 * alpha * income) * 100
+    debt = _ratio(profile["debt"], income) * 100
+    srate = _ratio(profile["savings"], income) * 100
+    invest = _ratio(profile["total_investments"], 12 * beta * income) * 100
+    efund = _ratio(profile["emergency_fund"], expenses) / 6 * 100
+
+    w = FHI_WEIGHTS
+    # More income shrinks every income ratio: helps debt-to-income, dilutes the rest
+    income_gain = (
+        - w["Net Worth"] * np.where((nw > 0) & (nw <= 100), nw, 0.0)
+        + w["Debt-to-Income"] * np.where((debt > 0) & (debt <= 100), debt, 0.0)
+        - w["Savings Rate"] * np.where(srate <= 100, srate, 0.0)
+        - w["Investment"] * np.where((invest > 0) & (invest <= 100), invest, 0.0)
+    ) / safe_income
+    gains = {
+        "income": income_gain,
+        "expenses": w["Emergency Fund"] * np.where(efund < 100, efund, 0.0) / safe_expenses,
+        "savings": w["Savings Rate"] * np.where(srate < 100, 100 / safe_income, 0.0),
+        "debt": w["Debt-to-Income"] * np.where((debt > 0) & (debt <= 100), 100 / safe_income, 0.0),
+        "total_investments": w["Investment"] * np.where(invest < 100, 100 / (12 * beta * safe_income), 0.0),
+        "emergency_fund": w["Emergency Fund"] * np.where(efund < 100, 100 / (6 * safe_expenses), 0.0),
+        "net_worth": w["Net Worth"] * np.where((nw >= 0) & (nw < 100), 100 / (12 * alpha * safe_income), 0.0),
+    }
+    for key in ("expenses", "emergency_fund"):
+        gains[key] = np.where(has_expenses & has_income, gains[key], 0.0)
+    for key in ("income", "savings", "debt", "total_investments", "net_worth"):
+        gains[key] = np.where(has_income, gains[key], 0.0)
+    return {key: (MARGINAL_ACTIONS[key][0], gain) for key, gain in gains.items()}
+
+def best_next_peso(profile, amount=1000.0):
+    """Rank the actions that raise FHI most per ``amount`` pesos moved, best first.
+
+    Returns a list of (input, action label, FHI points gained per amount) for a
+    single profile, leaving out actions that would not help.
+    """
+    ranking = [
+        (key, MARGINAL_ACTIONS[key][1], float(gain) * amount)
+        for key, (_, gain) in fhi_sensitivity(profile).items() if gain > 0
+    ]
+    return sorted(ranking, key=lambda item: -item[2])
+
+# ===============================
+# TIME-DOMAIN PROJECTION
+# ===============================
+
+def event_paths(events, months):
+    """Turn timed lever changes into month-by-month paths for project_scenarios.
+
+    ``events`` is a list of {"levers": {lever: pct, "savings_abs_delta": ₱, ...},
+    "start": month, "duration": months or None for permanent}. Flow levers (income,
+    expenses, savings, debt) apply while an event is active; invest_pct and
+    efund_pct change the balance once, when the event starts.
+    """
+    t = np.arange(1, months + 1)
+    paths = {
+        "income": np.ones(months), "expenses": np.ones(months), "savings": np.ones(months), "debt": np.ones(months),
+        "savings_abs": np.zeros(months), "debt_abs": np.zeros(months),
+        "invest_shock": np.zeros(months + 1), "efund_shock": np.zeros(months + 1),
+    }
+    for event in events:
+        start, duration = event.get("start", 0), event.get("duration")
+        active = (t > start) & ((t <= start + duration) if duration else True)
+        levers = event.get("levers", {})
+        for name, lever in (("income", "income_pct"), ("expenses", "expenses_pct"),
+                            ("savings", "savings_pct"), ("debt", "debt_pct")):
+            paths[name] = paths[name] * np.where(active, 1 + levers.get(lever, 0) / 100, 1.0)
+        paths["savings_abs"] = paths["savings_abs"] + np.where(active, levers.get("savings_abs_delta", 0), 0.0)
+        paths["debt_abs"] = paths["debt_abs"] + np.where(active, levers.get("debt_abs_delta", 0), 0.0)
+        if start <= months:
+            paths["invest_shock"][start] += levers.get("invest_pct", 0) / 100
+            paths["efund_shock"][start] += levers.get("efund_pct", 0) / 100
+    return paths
+
+def project_scenarios(profile, scenario_paths, annual_return=0.05):
+    """Project balances and FHI month by month for many scenarios at once.
+
+    ``scenario_paths`` is a list of event_paths results. Each month, planned savings
+    (up to the cash left after expenses and debt) refill the emergency fund to six
+    months of expenses, then go to investments; a cash shortfall drains the
+    emergency fund, then investments, and any remainder is borrowed. Balances are
+    stepped through time, vectorized across scenarios. Returns arrays shaped
+    (scenarios, months + 1), month 0 being today's profile.
+    """
+    stacked = {k: np.stack([p[k] for p in scenario_paths]) for k in scenario_paths[0]}
+    n, months = stacked["income"].shape
+    monthly_return = annual_return / 12
+
+    efund = np.full(n, float(profile["emergency_fund"]))
+    invest = np.full(n, float(profile["total_investments"]))
+    net_worth = np.full(n, float(profile["net_worth"]))
+    out = {k: np.zeros((n, months + 1)) for k in ("fhi", "emergency_fund", "total_investments", "net_worth")}
+
+    income = profile["income"] * stacked["income"]
+    expenses = profile["expenses"] * stacked["expenses"]
+    debt = np.maximum(profile["debt"] * stacked["debt"] + stacked["debt_abs"], 0.0)
+    planned = np.maximum(profile["savings"] * stacked["savings"] + stacked["savings_abs"], 0.0)
+    cash = income - expenses - debt
+    saved = np.clip(cash, 0.0, planned)
+    shortfall = np.maximum(-cash, 0.0)
+
+    for t in range(months + 1):
+        # One-time balance changes (e.g. investment growth %) at the start of an event
+        invest_change = invest * stacked["invest_shock"][:, t]
+        efund_change = efund * stacked["efund_shock"][:, t]
+        invest, efund = invest + invest_change, efund + efund_change
+        net_worth = net_worth + invest_change + efund_change
+        if t > 0:
+            m = t - 1
+            growth = invest * monthly_return
+            to_efund = np.minimum(saved[:, m], np.maximum(6 * expenses[:, m] - efund, 0.0))
+            from_efund = np.minimum(shortfall[:, m], efund)
+            from_invest = np.minimum(shortfall[:, m] - from_efund, invest + growth)
+            efund = efund + to_efund - from_efund
+            invest = invest + growth + saved[:, m] - to_efund - from_invest
+            net_worth = net_worth + growth + saved[:, m] - shortfall[:, m]
+            flows = {"income": income[:, m], "expenses": expenses[:, m], "savings": saved[:, m], "debt": debt[:, m]}
+        else:
+            # Month 0 keeps today's flows but is scored after its one-time balance changes
+            flows = {k: profile[k] for k in ("income", "expenses", "savings", "debt")}
+
+        fhi, _ = profile_fhi({"age": profile["age"], **flows, "total_investments": invest,
+                              "net_worth": net_worth, "emergency_fund": efund})
+        out["fhi"][:, t] = fhi
+        out["emergency_fund"][:, t] = efund
+        out["total_investments"][:, t] = invest
+        out["net_worth"][:, t] = net_worth
+    return out
+
+# ===============================
+# STRESS TESTING
+# ===============================
+
+STRESS_FACTORS = ("income", "expenses", "investments")
+
+def stress_test_fhi(profile, n_samples=5000, income_volatility=0.15, expense_volatility=0.10,
+                    market_volatility=0.20, income_market_correlation=0.4, income_expense_correlation=0.2,
+                    seed=0, **levers):
+    """Score FHI under thousands of correlated shocks around a scenario, in one batched kernel pass.
+
+    Income, expenses and investment value get log-normal shocks (mean-preserving)
+    with the given volatilities and correlations; an investment shock also moves
+    net worth by the same amount. ``levers`` set the scenario (see apply_scenario).
+    Returns the FHI samples with their P5/P50/P95 and the probability of scoring below 50.
+    """
+    scenario = apply_scenario(profile, **levers)
+    vols = np.array([income_volatility, expense_volatility, market_volatility])
+    corr = np.array([
+        [1.0, income_expense_correlation, income_market_correlation],
+        [income_expense_correlation, 1.0, 0.0],
+        [income_market_correlation, 0.0, 1.0],
+    ])
+    # Nearest valid correlation if the chosen pair is inconsistent
+    eigvals, eigvecs = np.linalg.eigh(corr)
+    corr = eigvecs @ np.diag(np.maximum(eigvals, 1e-9)) @ eigvecs.T
+    chol = np.linalg.cholesky(corr)
+
+    rng = np.random.default_rng(seed)
+    z = rng.standard_normal((n_samples, 3)) @ chol.T
+    factors = np.exp(z * vols - 0.5 * vols ** 2)
+
+    investments = scenario["total_investments"] * factors[:, 2]
+    fhi, _ = profile_fhi({
+        "age": scenario["age"],
+        "income": scenario["income"] * factors[:, 0],
+        "expenses": scenario["expenses"] * factors[:, 1],
+        "savings": scenario["savings"],
+        "debt": scenario["debt"],
+        "total_investments": investments,
+        "net_worth": scenario["net_worth"] + investments - scenario["total_investments"],
+        "emergency_fund": scenario["emergency_fund"],
+    })
+    p5, p50, p95 = np.percentile(fhi, [5, 50, 95])
+    return {"samples": fhi, "p5": float(p5), "p50": float(p50), "p95": float(p95),
+            "prob_below_50": float((fhi < 50).mean())}
@@ -0,0 +1,133 @@
+"""Plotly figure factory shared by the app pages.
+
+Styled base figures are built once per process; each chart copies its base and
+patches in only the data. Results are memoized on the inputs, so reruns with
+unchanged data reuse the cached figure dict instead of rebuilding it.
+"""
+import copy
+
+import plotly.graph_objects as go
+import streamlit as st
+
+# ===============================
+# BASE FIGURES
+# ===============================
+
+def _as_dict(fig):
+    """Figure dict without the embedded plotly template (Streamlit applies its own theme)"""
+    fig = fig.to_dict()
+    fig["layout"].pop("template", None)
+    return fig
+
+@st.cache_resource
+def _base_figures():
+    """Build every styled base figure once per process"""
+    gauge = go.Figure(go.Indicator(
+        mode="gauge+number",
+        value=0,
+        title={"text": "Your FHI Score"},
+        gauge={
+            'axis': {'range': [0, 100]},
+            'bar': {'color': "darkblue"},
+            'steps': [
+                {'range': [0, 50], 'color': "salmon"},
+                {'range': [50, 70], 'color': "gold"},
+                {'range': [70, 100], 'color': "lightgreen"}
+            ]
+        }
+    ))
+    gauge.update_layout(height=300, margin=dict(t=20, b=20))
+
+    radar = go.Figure([
+        go.Scatterpolar(r=[], theta=[], fill='toself', name='Your Scores', line_color='blue'),
+        go.Scatterpolar(r=[], theta=[], fill='toself', name='Target (70%)', line_color='green', opacity=0.3),
+    ])
+    radar.update_layout(polar=dict(radialaxis=dict(visible=True, range=[0, 100])), showlegend=True, height=400)
+
+    comparison = go.Figure([
+        go.Scatterpolar(r=[], theta=[], fill='toself', name='Current', line_color='blue', opacity=0.6),
+        go.Scatterpolar(r=[], theta=[], fill='toself', name='Scenario', line_color='red', opacity=0.6),
+    ])
+    comparison.update_layout(polar=dict(radialaxis=dict(visible=True, range=[0, 100])), showlegend=True,
+                             height=400, title="Current vs Scenario Comparison")
+
+    deltas = go.Figure(go.Bar(x=[], y=[], marker_line_width=0, hovertemplate="%{x}: %{y:+.1f}<extra></extra>"))
+    deltas.update_layout(height=260, margin=dict(t=40, b=10, l=10, r=10), showlegend=False,
+                         yaxis=dict(title="Δ points", zeroline=True, zerolinecolor="#888"),
+                         xaxis=dict(tickangle=-30), title=dict(text="", font=dict(size=14)))
+
+    pie = go.Figure(go.Pie(labels=[], values=[]))
+    pie.update_layout(title="Expenses by Category", legend=dict(tracegroupgap=0))
+
+    daily = go.Figure([
+        go.Bar(x=[], y=[], name="Income", legendgroup="Income"),
+        go.Bar(x=[], y=[], name="Expense", legendgroup="Expense"),
+    ])
+    daily.update_layout(title="Daily Income vs Expenses", barmode="group", xaxis_title="date",
+                        yaxis_title="amount", legend_title_text="type")
+
+    return {name: _as_dict(fig) for name, fig in (
+        ("gauge", gauge), ("radar", radar), ("comparison", comparison),
+        ("deltas", deltas), ("pie", pie), ("daily", daily),
+    )}
+
+def _from_base(name):
+    return copy.deepcopy(_base_figures()[name])
+
+# ===============================
+# FHI FIGURES
+# ===============================
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def fhi_gauge(score):
+    """Gauge for an FHI score"""
+    fig = _from_base("gauge")
+    fig["data"][0]["value"] = score
+    return fig
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def component_radar(components):
+    """Radar of component scores against the 70-point target; components is a tuple of (name, score)"""
+    fig = _from_base("radar")
+    categories = [name for name, _ in components]
+    fig["data"][0].update(r=[float(score) for _, score in components], theta=categories)
+    fig["data"][1].update(r=[70] * len(categories), theta=categories)
+    return fig
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def comparison_radar(base_components, new_components):
+    """Current vs scenario component radar; both are tuples of (name, score)"""
+    fig = _from_base("comparison")
+    for trace, components in zip(fig["data"], (base_components, new_components)):
+        trace.update(r=[float(v) if v is not None else 0.0 for _, v in components],
+                     theta=[name for name, _ in components])
+    return fig
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def component_deltas(title, components, deltas):
+    """Small-multiple bar chart of one scenario's component changes"""
+    fig = _from_base("deltas")
+    fig["data"][0].update(x=list(components), y=[float(d) for d in deltas],
+                          marker={"color": ["#2e7d32" if d >= 0 else "#c62828" for d in deltas],
+                                  "line": {"width": 0}})
+    fig["layout"]["title"]["text"] = title
+    return fig
+
+# ===============================
+# BUDGET FIGURES
+# ===============================
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def expense_pie(categories, amounts):
+    """Expense share by category"""
+    fig = _from_base("pie")
+    fig["data"][0].update(labels=list(categories), values=list(amounts))
+    return fig
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def daily_income_expense(income, expense):
+    """Grouped daily bars; income and expense are tuples of (date, amount)"""
+    fig = _from_base("daily")
+    for trace, points in zip(fig["data"], (income, expense)):
+        trace.update(x=[d for d, _ in points], y=[a for _, a in points])
+    return fig
@@ -0,0 +1,282 @@
+"""Vectorized schedule and progress math for the Goal Tracker"""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from month_calendar import month_date, month_index, month_label, month_schedule, parse_month_label
+
+# ===============================
+# GOAL SCHEDULES & PROGRESS
+# ===============================
+
+# A goal's progress is stored compactly as {"start": month index, "bits": int}, where
+# bit i is set when month start + i was marked as saved. A 30-year goal is one integer,
+# and counting saved months / finding the last saved month are popcount / bit-length.
+
+def empty_progress():
+    """Return progress with no months marked"""
+    return {"start": 0, "bits": 0}
+
+def normalize_progress(progress):
+    """Return progress in the compact form, migrating legacy {"YYYY-MM": bool} dicts"""
+    if not progress:
+        return empty_progress()
+    if "bits" in progress:
+        return progress
+    compact = empty_progress()
+    for label, saved in progress.items():
+        if saved:
+            set_month(compact, parse_month_label(label), True)
+    return compact
+
+def is_month_saved(progress, month):
+    """True if the given month index is marked as saved"""
+    offset = month - progress["start"]
+    return offset >= 0 and bool(progress["bits"] >> offset & 1)
+
+def set_month(progress, month, saved):
+    """Mark or unmark a month index as saved, in place"""
+    set_month_range(progress, month, month, saved)
+
+def set_month_range(progress, first_month, last_month, saved):
+    """Mark or unmark every month from first_month through last_month in one operation, in place"""
+    if not progress["bits"]:
+        progress["start"] = first_month
+    elif first_month < progress["start"]:
+        # Re-anchor at the earlier month so offsets stay non-negative
+        progress["bits"] <<= progress["start"] - first_month
+        progress["start"] = first_month
+    mask = ((1 << (last_month - first_month + 1)) - 1) << (first_month - progress["start"])
+    progress["bits"] = progress["bits"] | mask if saved else progress["bits"] & ~mask
+
+def saved_in_range(progress, first_month, n_months):
+    """Return (months saved, last saved offset or -1) within a goal's schedule"""
+    if n_months <= 0 or not progress["bits"]:
+        return 0, -1
+    shift = int(first_month) - progress["start"]
+    window = progress["bits"] >> shift if shift >= 0 else progress["bits"] << -shift
+    window &= (1 << int(n_months)) - 1
+    return window.bit_count(), window.bit_length() - 1
+
+def encode_progress(progress):
+    """Serialize progress as "YYYY-MM:hexbits" (e.g. "2024-01:5" = Jan and Mar 2024)"""
+    return f"{month_label(progress['start'])}:{progress['bits']:x}"
+
+def decode_progress(text):
+    """Parse progress written by encode_progress"""
+    if not text:
+        return empty_progress()
+    label, bits = text.split(":")
+    return {"start": parse_month_label(label), "bits": int(bits, 16)}
+
+def goal_metrics(goals, current_savings):
+    """Compute schedule and progress figures for every goal at once.
+
+    ``current_savings`` is either one amount counted toward every goal or an
+    array with each goal's share. Returns a dict of arrays aligned with ``goals``.
+    """
+    count = len(goals)
+    amounts = np.array([g.get("goal_amount", 1000.0) for g in goals], dtype=float)
+    first_months = np.zeros(count, dtype=np.int64)
+    n_months = np.zeros(count, dtype=np.int64)
+    checked = np.zeros(count, dtype=np.int64)
+    last_checked = np.full(count, -1, dtype=np.int64)
+
+    for i, goal in enumerate(goals):
+        first_months[i], n_months[i] = month_schedule(goal.get("start_date", date.today()),
+                                                      goal.get("target_date", date.today()))
+        checked[i], last_checked[i] = saved_in_range(normalize_progress(goal.get("progress")),
+                                                     first_months[i], n_months[i])
+
+    # Evenly split what current savings don't already cover across the schedule
+    base_pool = np.maximum(amounts - current_savings, 0.0)
+    safe_months = np.maximum(n_months, 1)
+    base_per_month = np.where(n_months > 0, base_pool / safe_months, 0.0)
+    saved = checked * base_per_month
+    remaining = np.maximum(base_pool - saved, 0.0)
+
+    # Missed months before the last checked one roll over into the months after it
+    open_slots = n_months - (last_checked + 1)
+    required = np.where(open_slots > 0, remaining / np.maximum(open_slots, 1), 0.0)
+    progress = np.where(amounts > 0, np.minimum(saved / np.where(amounts > 0, amounts, 1.0), 1.0), 0.0)
+
+    return {
+        "first_month": first_months,
+        "n_months": n_months,
+        "checked": checked,
+        "last_checked": last_checked,
+        "base_pool": base_pool,
+        "base_per_month": base_per_month,
+        "saved": saved,
+        "remaining": remaining,
+        "open_slots": open_slots,
+        "required_monthly": required,
+        "progress": progress,
+    }
+
+# ===============================
+# TIMELINES
+# ===============================
+
+def saved_flags(progress, first_month, n_months):
+    """Return a 0/1 array with one entry per schedule month, 1 where the month was saved"""
+    if n_months <= 0:
+        return np.zeros(0, dtype=np.int64)
+    shift = int(first_month) - progress["start"]
+    window = progress["bits"] >> shift if shift >= 0 else progress["bits"] << -shift
+    bits = format(window & ((1 << int(n_months)) - 1), f"0{int(n_months)}b")[::-1]
+    return np.frombuffer(bits.encode(), dtype=np.uint8).astype(np.int64) - ord("0")
+
+def goal_timeline(goal, savings_share=0.0, today=None):
+    """Return a DataFrame of projected and actual cumulative savings for one goal, by month.
+
+    Projected follows the even schedule from the savings already applied up to the
+    goal amount; Actual counts the months marked as saved, up to the current month.
+    """
+    amount = goal.get("goal_amount", 1000.0)
+    first, count = month_schedule(goal.get("start_date", date.today()), goal.get("target_date", date.today()))
+    per_month = max(amount - savings_share, 0.0) / count if count else 0.0
+
+    months = np.arange(first, first + count)
+    projected = savings_share + per_month * np.arange(1, count + 1)
+    actual = savings_share + per_month * np.cumsum(saved_flags(normalize_progress(goal.get("progress")), first, count))
+    actual = np.where(months <= month_index(today or date.today()), actual, np.nan)
+
+    return pd.DataFrame({"Projected": projected, "Actual": actual},
+                        index=pd.Index([month_date(m) for m in months], name="Month"))
+
+def goal_signature(goal, savings_share):
+    """Everything a goal's timeline depends on; the cached series is reused while this is unchanged"""
+    progress = normalize_progress(goal.get("progress"))
+    return (goal.get("goal_amount", 1000.0), goal.get("start_date"), goal.get("target_date"),
+            progress["start"], progress["bits"], round(float(savings_share), 2), month_index(date.today()))
+
+def cached_goal_timeline(cache, goal_id, goal, savings_share=0.0):
+    """Return goal_timeline(goal), recomputing only when this goal's signature changes"""
+    signature = goal_signature(goal, savings_share)
+    hit = cache.get(goal_id)
+    if hit is not None and hit[0] == signature:
+        return hit[1]
+    timeline = goal_timeline(goal, savings_share)
+    cache[goal_id] = (signature, timeline)
+    return timeline
+
+def combined_timeline(timelines, today=None):
+    """Sum goal timelines month by month; finished goals keep counting at their final amount"""
+    if not timelines:
+        return pd.DataFrame(columns=["Projected", "Actual"])
+    months = sorted(set().union(*(t.index for t in timelines)))
+    total = sum(t.reindex(months).ffill().fillna(0.0) for t in timelines)
+    now = month_date(month_index(today or date.today()))
+    total.loc[total.index > now, "Actual"] = np.nan
+    return total
+
+# ===============================
+# SAVINGS ALLOCATION
+# ===============================
+
+PRIORITIES = ["High", "Medium", "Low"]
+
+def funding_order(goals, deadlines):
+    """Return goal positions ordered by priority, then earliest deadline"""
+    priorities = [PRIORITIES.index(g.get("priority", "Medium")) for g in goals]
+    return np.lexsort((deadlines, priorities))
+
+def fill_in_order(demand, order, pool):
+    """Hand out a shared pool in the given order, each goal taking up to its full demand"""
+    demand = np.asarray(demand, dtype=float)
+    need = demand[order]
+    funded_before = np.concatenate(([0.0], np.cumsum(need)[:-1]))
+    granted = np.empty_like(demand)
+    granted[order] = np.clip(pool - funded_before, 0.0, need)
+    return granted
+
+def plan_savings(goals, current_savings, surplus):
+    """Share current savings and the monthly surplus across all goals.
+
+    Current savings are applied to goal amounts, and the monthly surplus to each
+    goal's required monthly saving, both in funding order. Returns the goal_metrics
+    arrays plus the allocation and which goals are feasible.
+    """
+    schedule = goal_metrics(goals, 0.0)
+    deadlines = schedule["first_month"] + schedule["n_months"] - 1
+    order = funding_order(goals, deadlines)
+
+    savings_share = fill_in_order([g.get("goal_amount", 1000.0) for g in goals], order, max(current_savings, 0.0))
+    plan = goal_metrics(goals, savings_share)
+
+    # A goal whose schedule has run out but still has money left cannot be met
+    overdue = (plan["open_slots"] <= 0) & (plan["remaining"] > 0)
+    required = np.where(overdue, 0.0, plan["required_monthly"])
+    allocated = fill_in_order(required, order, max(surplus, 0.0))
+
+    plan["deadline"] = deadlines
+    plan["order"] = order
+    plan["savings_share"] = savings_share
+    plan["allocated_monthly"] = allocated
+    plan["shortfall_monthly"] = np.maximum(required - allocated, 0.0)
+    plan["feasible"] = ~overdue & (plan["shortfall_monthly"] <= 0.005)
+    return plan
+
+# ===============================
+# FEASIBILITY SIMULATION
+# ===============================
+
+SIMULATION_PATHS = 2000
+
+def simulate_balances(start_balance, income, expenses, months, n_paths=SIMULATION_PATHS,
+                      income_volatility=0.03, expense_drift=0.003, expense_volatility=0.02,
+                      annual_return=0.05, return_volatility=0.10, seed=None):
+    """Simulate pooled savings balances month by month.
+
+    Income and expenses follow log-normal random walks (expenses drift upward with
+    inflation), the monthly surplus is saved and the balance earns a random monthly
+    return. Returns an (n_paths, months + 1) array; column t is the balance after t months.
+    """
+    rng = np.random.default_rng(seed)
+    shape = (n_paths, max(int(months), 0))
+    income_path = income * np.exp(np.cumsum(
+        rng.normal(-0.5 * income_volatility ** 2, income_volatility, shape), axis=1))
+    expense_path = expenses * np.exp(np.cumsum(rng.normal(expense_drift, expense_volatility, shape), axis=1))
+    surplus = np.maximum(income_path - expense_path, 0.0)
+
+    # With G_t the cumulative growth factor, B_t = G_t * (B_0 + sum_{s<=t} surplus_s / G_s),
+    # so the whole recursion is one cumprod and one cumsum
+    growth = np.cumprod(1.0 + rng.normal(annual_return / 12, return_volatility / np.sqrt(12), shape), axis=1)
+    balances = growth * (start_balance + np.cumsum(surplus / growth, axis=1))
+    return np.hstack([np.full((n_paths, 1), float(start_balance)), balances])
+
+def simulate_goals(goals, current_savings, income, expenses, today=None, **assumptions):
+    """Estimate each goal's chance of being fully funded by its target date.
+
+    All goals draw on the same simulated balance paths. Goals ahead in funding
+    order (see funding_order) claim their full amount first. Returns per-goal
+    probability and 10th/50th/90th percentile balance available at the deadline,
+    plus percentile bands of the pooled balance.
+    """
+    schedule = goal_metrics(goals, 0.0)
+    deadlines = schedule["first_month"] + schedule["n_months"] - 1
+    order = funding_order(goals, deadlines)
+    amounts = np.array([g.get("goal_amount", 1000.0) for g in goals], dtype=float)
+
+    now = month_index(today or date.today())
+    months_ahead = np.clip(deadlines - now + 1, 0, None)
+    horizon = int(months_ahead.max()) if len(goals) else 0
+    balances = simulate_balances(max(current_savings, 0.0), income, expenses, horizon, **assumptions)
+
+    claimed_ahead = np.empty_like(amounts)
+    claimed_ahead[order] = np.concatenate(([0.0], np.cumsum(amounts[order])[:-1]))
+    available = balances[:, months_ahead] - claimed_ahead
+    bands = np.percentile(available, [10, 50, 90], axis=0)
+
+    return {
+        "start_month": now,
+        "months_ahead": months_ahead,
+        "order": order,
+        "probability": (available >= amounts).mean(axis=0),
+        "p10": bands[0],
+        "p50": bands[1],
+        "p90": bands[2],
+        "balance_bands": np.percentile(balances, [10, 50, 90], axis=0),
+    }
@@ -0,0 +1,35 @@
+"""Integer month-index helpers shared by the Budget Tracker and Goal Tracker"""
+from datetime import date
+
+import numpy as np
+
+# A month index counts months since year 0: year * 12 + (month - 1).
+# Consecutive months are consecutive integers, so schedules become plain ranges.
+
+def month_index(d):
+    """Return the month index of a date"""
+    return d.year * 12 + d.month - 1
+
+def month_label(idx):
+    """Return the "YYYY-MM" label for a month index"""
+    idx = int(idx)
+    return f"{idx // 12:04d}-{idx % 12 + 1:02d}"
+
+def parse_month_label(label):
+    """Return the month index of a "YYYY-MM" label"""
+    return int(label[:4]) * 12 + int(label[5:7]) - 1
+
+def month_date(idx):
+    """Return the first day of the month for a month index"""
+    idx = int(idx)
+    return date(idx // 12, idx % 12 + 1, 1)
+
+def month_schedule(start, target):
+    """Return (first month index, number of months) covering start through target, inclusive"""
+    first = month_index(start)
+    return first, max(month_index(target) - first + 1, 0)
+
+def month_indices(start, target):
+    """Return every month index from start through target as an array"""
+    first, count = month_schedule(start, target)
+    return np.arange(first, first + count)
@@ -4,6 +4,13 @@ import plotly.express as px
 import base64
 from datetime import date
 
+from budget_analytics import (
+    FORECAST_METHODS, apply_entry, build_anomaly_state, build_rollups, cached_view, category_share,
+    forecast_cashflow, month_over_month, monthly_spend_outliers, monthly_totals, rolling_averages,
+    score_entry,
+)
+from figures import daily_income_expense, expense_pie
+
 def get_base64_image(image_path):
     with open(image_path, "rb") as f:
         data = f.read()
@@ -64,6 +71,16 @@ if "budget_entries" not in st.session_state:
 if "edit_index" not in st.session_state:
     st.session_state.edit_index = None
 
+# Month × category × type rollups, kept in step with budget_entries
+if "budget_rollups" not in st.session_state:
+    st.session_state.budget_rollups = build_rollups(st.session_state.budget_entries)
+if "budget_view_cache" not in st.session_state:
+    st.session_state.budget_view_cache = {}
+
+# Streaming per-category spending anomaly detector
+if "budget_anomalies" not in st.session_state:
+    st.session_state.budget_anomalies = build_anomaly_state(st.session_state.budget_entries)
+
 # --- BUDGET ENTRY FORM ---
 st.subheader("➕ Add New Entry")
 with st.form("budget_form"):
@@ -98,12 +115,50 @@ with st.form("budget_form"):
         }
 
         if st.session_state.edit_index is not None:
+            old_entry = st.session_state.budget_entries[st.session_state.edit_index]
+            apply_entry(st.session_state.budget_rollups, old_entry, sign=-1)
+            apply_entry(st.session_state.budget_rollups, new_entry)
             st.session_state.budget_entries[st.session_state.edit_index] = new_entry
+            st.session_state.budget_anomalies = build_anomaly_state(st.session_state.budget_entries)
             st.session_state.edit_index = None
             st.success("✅ Entry updated!")
         else:
             st.session_state.budget_entries.append(new_entry)
+            apply_entry(st.session_state.budget_rollups, new_entry)
+            alert = score_entry(st.session_state.budget_anomalies,
+                                len(st.session_state.budget_entries) - 1, new_entry)
             st.success("✅ Entry added!")
+            if alert:
+                st.warning(f"🚨 Unusually high {alert['category']} expense: "
+                           f"₱{alert['amount']:,.2f} vs a typical ₱{alert['expected']:,.2f}")
+
+# --- BULK IMPORT ---
+with st.expander("📤 Import Transactions (CSV)"):
+    st.caption("CSV columns: date, type (Income or Expense), category, amount")
+    uploaded = st.file_uploader("CSV file", type="csv", key="budget_import_file")
+    if uploaded is not None and st.button("Import Entries", key="budget_import_btn"):
+        imported = pd.read_csv(uploaded)
+        imported.columns = [str(c).strip().lower() for c in imported.columns]
+        missing = {"date", "type", "category", "amount"} - set(imported.columns)
+
+        if missing:
+            st.error(f"❌ Missing column(s): {', '.join(sorted(missing))}")
+        else:
+            imported["date"] = pd.to_datetime(imported["date"], errors="coerce").dt.date
+            imported["type"] = imported["type"].astype(str).str.strip().str.title()
+            imported["category"] = imported["category"].fillna("Others").astype(str)
+            imported["amount"] = pd.to_numeric(imported["amount"], errors="coerce").abs()
+            imported = imported[imported["type"].isin(["Income", "Expense"])].dropna(subset=["date", "amount"])
+
+            new_entries = imported[["date", "type", "category", "amount"]].to_dict("records")
+            entries = st.session_state.budget_entries
+            entries.extend(new_entries)
+
+            # One grouped pass over the whole ledger instead of per-entry updates
+            st.session_state.budget_rollups = build_rollups(
+                entries, version=st.session_state.budget_rollups["version"] + 1)
+            st.session_state.budget_anomalies = build_anomaly_state(entries)
+            st.success(f"✅ Imported {len(new_entries):,} entries!")
 
 # --- IF THERE ARE ENTRIES ---
 if st.session_state.budget_entries:
@@ -127,16 +182,126 @@ if st.session_state.budget_entries:
     with col4:
         expense_df = df[df["type"] == "Expense"]
         if not expense_df.empty:
-            pie = px.pie(expense_df, values="amount", names="category", title="Expenses by Category")
+            by_category = expense_df.groupby("category", sort=False)["amount"].sum()
+            pie = expense_pie(tuple(by_category.index), tuple(by_category.values.tolist()))
             st.plotly_chart(pie, use_container_width=True)
         else:
             st.info("No expenses to show.")
 
     with col5:
-        df_by_date = df.groupby(["date", "type"])["amount"].sum().reset_index()
-        bar = px.bar(df_by_date, x="date", y="amount", color="type", barmode="group", title="Daily Income vs Expenses")
+        by_date = df.groupby(["type", "date"])["amount"].sum()
+        daily = {t: tuple(by_date[t].items()) if t in by_date.index.levels[0] else () for t in ("Income", "Expense")}
+        bar = daily_income_expense(daily["Income"], daily["Expense"])
         st.plotly_chart(bar, use_container_width=True)
 
+    # --- MONTHLY TRENDS (read from rollups, not raw entries) ---
+    st.subheader("📅 Monthly Trends")
+    rollups = st.session_state.budget_rollups
+    view_cache = st.session_state.budget_view_cache
+    monthly = cached_view(view_cache, "monthly_totals", rollups, monthly_totals)
+
+    trend_tab, rolling_tab, share_tab = st.tabs(["Month over Month", "Rolling Averages", "Category Share"])
+
+    with trend_tab:
+        trend = px.line(monthly.reset_index(), x="month", y=["Income", "Expense", "Net"],
+                        markers=True, title="Monthly Income, Expenses and Net Savings")
+        st.plotly_chart(trend, use_container_width=True)
+
+        mom = cached_view(view_cache, "month_over_month", rollups,
+                          lambda r: month_over_month(monthly))
+        if len(mom) > 1:
+            latest = mom.iloc[-1]
+            colA, colB, colC = st.columns(3)
+            for col, name in zip((colA, colB, colC), ("Income", "Expense", "Net")):
+                value = latest[name]
+                col.metric(f"{name} vs last month", f"₱{monthly[name].iloc[-1]:,.2f}",
+                           delta=None if pd.isna(value) else f"{value:+.1f}%",
+                           delta_color="inverse" if name == "Expense" else "normal")
+        else:
+            st.caption("Month-over-month changes appear once you have two months of entries.")
+
+    with rolling_tab:
+        window = st.radio("Window (months)", [3, 6, 12], horizontal=True, key="rolling_window")
+        rolling = cached_view(view_cache, "rolling_averages", rollups,
+                              lambda r: rolling_averages(monthly))
+        rolling_fig = px.line(rolling[window].reset_index(), x="month", y=["Income", "Expense", "Net"],
+                              markers=True, title=f"{window}-Month Rolling Averages")
+        st.plotly_chart(rolling_fig, use_container_width=True)
+
+    with share_tab:
+        share = cached_view(view_cache, "category_share", rollups, category_share)
+        if share.empty or share.columns.empty:
+            st.info("No expenses to show.")
+        else:
+            share_fig = px.area(share.reset_index(), x="month", y=list(share.columns),
+                                title="Expense Share by Category (%)")
+            share_fig.update_layout(yaxis_title="Share of expenses (%)", legend_title="Category")
+            st.plotly_chart(share_fig, use_container_width=True)
+
+    # --- SPENDING ALERTS ---
+    st.subheader("🚨 Spending Alerts")
+    alerts = st.session_state.budget_anomalies["alerts"]
+    outliers = cached_view(view_cache, "monthly_outliers", rollups, monthly_spend_outliers)
+
+    colA, colB = st.columns(2)
+    with colA:
+        st.markdown("**Unusual transactions**")
+        if alerts:
+            recent = sorted(alerts, key=lambda a: a["index"], reverse=True)[:10]
+            st.dataframe(pd.DataFrame({
+                "Date": [str(a["date"])[:10] for a in recent],
+                "Category": [a["category"] for a in recent],
+                "Amount": [f"₱{a['amount']:,.2f}" for a in recent],
+                "Typical": [f"₱{a['expected']:,.2f}" for a in recent],
+            }), hide_index=True, use_container_width=True)
+            st.caption(f"{len(alerts)} expense(s) far above their category's recent average.")
+        else:
+            st.success("No unusual transactions detected.")
+
+    with colB:
+        st.markdown("**Unusual months**")
+        if not outliers.empty:
+            st.dataframe(pd.DataFrame({
+                "Month": outliers["month"],
+                "Category": outliers["category"],
+                "Spent": [f"₱{v:,.2f}" for v in outliers["amount"]],
+                "Median": [f"₱{v:,.2f}" for v in outliers["median"]],
+            }), hide_index=True, use_container_width=True)
+        else:
+            st.success("No unusual months detected.")
+
+    # --- CASH-FLOW FORECAST ---
+    st.subheader("🔮 Cash-flow Forecast")
+    colA, colB = st.columns(2)
+    with colA:
+        horizon = st.slider("Months ahead", 3, 12, 6, key="forecast_horizon")
+    with colB:
+        method = st.radio("Method", FORECAST_METHODS, horizontal=True, key="forecast_method",
+                          help="Holt-Winters needs 24 months of history for seasonality; "
+                               "with less it follows the recent trend.")
+
+    # Cached per ledger version, so it only refits when entries change
+    forecast = cached_view(view_cache, f"forecast_{method}_{horizon}", rollups,
+                           lambda r: forecast_cashflow(r, horizon, method))
+    projected = forecast["totals"]
+
+    combined = pd.concat([monthly.assign(Series="Actual"), projected.assign(Series="Forecast")])
+    combined = combined.reset_index().melt(id_vars=["month", "Series"], value_vars=["Income", "Expense", "Net"],
+                                           var_name="Total", value_name="amount")
+    forecast_fig = px.line(combined, x="month", y="amount", color="Total", line_dash="Series",
+                           markers=True, title=f"Next {horizon} Months ({method})")
+    st.plotly_chart(forecast_fig, use_container_width=True)
+
+    colA, colB, colC = st.columns(3)
+    colA.metric("Projected Income", f"₱{projected['Income'].sum():,.2f}")
+    colB.metric("Projected Expenses", f"₱{projected['Expense'].sum():,.2f}")
+    colC.metric("Projected Net Savings", f"₱{projected['Net'].sum():,.2f}")
+
+    with st.expander("Forecast by category"):
+        by_category = forecast["by_category"]
+        by_category = by_category.set_axis([f"{t}: {c}" for t, c in by_category.columns], axis=1)
+        st.dataframe(by_category.style.format("₱{:,.2f}"), use_container_width=True)
+
     col1, col2 = st.columns(2)
 
     with col1:
@@ -147,10 +312,12 @@ if st.session_state.budget_entries:
                 if colA.button("✏️ Edit", key=f"edit_{i}"):
                     st.session_state.edit_index = i
                     # preload values
-                    st.experimental_rerun()
+                    st.rerun()
                 if colB.button("❌ Delete", key=f"delete_{i}"):
-                    st.session_state.budget_entries.pop(i)
-                    st.experimental_rerun()
+                    removed = st.session_state.budget_entries.pop(i)
+                    apply_entry(st.session_state.budget_rollups, removed, sign=-1)
+                    st.session_state.budget_anomalies = build_anomaly_state(st.session_state.budget_entries)
+                    st.rerun()
 
     with col2:
         st.subheader("📂 Expense Breakdown")
@@ -2,6 +2,14 @@ import streamlit as st, uuid, math
 import base64
 from datetime import date
 
+import pandas as pd
+
+from goal_planning import (PRIORITIES, cached_goal_timeline, combined_timeline, empty_progress, is_month_saved,
+                           normalize_progress, plan_savings, saved_in_range, set_month, set_month_range,
+                           simulate_goals)
+from month_calendar import month_date, month_label
+from storage import load_goals, save_goal, save_goal_progress
+
 def get_base64_image(image_path):
     with open(image_path, "rb") as f:
         data = f.read()
@@ -65,6 +73,50 @@ if "goals" not in st.session_state:
     st.session_state.goals = {}
 if "selected_goal" not in st.session_state:
     st.session_state.selected_goal = None
+if "goal_timeline_cache" not in st.session_state:
+    st.session_state.goal_timeline_cache = {}
+
+# Load saved goals once per signed-in user (goals created before signing in are kept)
+user_id = st.session_state.get("user_id")
+if user_id and st.session_state.get("goals_loaded_for") != user_id:
+    saved_goals = load_goals(user_id)
+    if saved_goals is not None:
+        st.session_state.goals = {**saved_goals, **st.session_state.goals}
+    # Record the attempt even on failure so a broken sheet is not re-read on every rerun
+    st.session_state.goals_loaded_for = user_id
+
+# Goals kept from older sessions may still hold per-month dicts
+for _goal in st.session_state.goals.values():
+    _goal["progress"] = normalize_progress(_goal.get("progress"))
+
+def record_month(goal_id, month):
+    """Checkbox callback: update a roadmap month and save just that change"""
+    checked = st.session_state[f"chk_{goal_id}_{month_label(month)}"]
+    set_month(st.session_state.goals[goal_id]["progress"], month, checked)
+    if user_id:
+        save_goal_progress(user_id, goal_id, month, checked)
+
+def mark_months_through(goal_id, first_month):
+    """Button callback: mark every month from the start through the chosen month as saved"""
+    last_month = st.session_state[f"mark_through_{goal_id}"]
+    set_month_range(st.session_state.goals[goal_id]["progress"], first_month, last_month, True)
+    # Drop checkbox state so the visible year re-reads the updated progress
+    for key in [k for k in st.session_state if str(k).startswith(f"chk_{goal_id}_")]:
+        del st.session_state[key]
+    if user_id:
+        save_goal_progress(user_id, goal_id, first_month, True, last_month)
+
+def current_plan():
+    """Share current savings and the monthly surplus across all goals (in st.session_state.goals order)"""
+    surplus = st.session_state.get("monthly_income", 0) - st.session_state.get("monthly_expenses", 0)
+    return plan_savings(list(st.session_state.goals.values()),
+                        st.session_state.get("current_savings", 0), max(surplus, 0))
+
+def timeline_for(goal_id, plan):
+    """Projected-vs-actual series for one goal, cached until that goal (or its savings share) changes"""
+    idx = list(st.session_state.goals).index(goal_id)
+    return cached_goal_timeline(st.session_state.goal_timeline_cache, goal_id,
+                                st.session_state.goals[goal_id], plan["savings_share"][idx])
 
 # Common emoji options
 emoji_options = ["🎯", "💰", "🏠", "🚗", "🎓", "✈️", "💼", "❤️", "📚", "🛍️", "📈", "🎁"]
@@ -79,8 +131,11 @@ if st.button("➕ Add New Goal"):
         "target_date": date.today(),
         "use_recommended_fhi": True,
         "emoji": "🎯",
-        "progress": {}
+        "priority": "Medium",
+        "progress": empty_progress()
     }
+    if user_id:
+        save_goal(user_id, goal_id, st.session_state.goals[goal_id])
     st.session_state.selected_goal = goal_id
     st.rerun()
 
@@ -90,61 +145,17 @@ goals = list(st.session_state.goals.items())
 cols_per_row = 4
 num_rows = math.ceil(len(goals) / cols_per_row)
 
+# Progress and savings allocation for every goal in one vectorized pass
+plan = current_plan()
+
 for i in range(num_rows):
     row_goals = goals[i * cols_per_row:(i + 1) * cols_per_row]
     cols = st.columns(cols_per_row)
-    for col, (goal_id, goal) in zip(cols, row_goals):
+    for j, (col, (goal_id, goal)) in enumerate(zip(cols, row_goals)):
         with col:
-            target_date = goal.get("target_date", date.today())
-            start_date = goal.get("start_date", date.today())
-            goal_amount = goal.get("goal_amount", 1000.0)
-            current_savings = st.session_state.get("current_savings", 0)
-            monthly_income = st.session_state.get("monthly_income", 0)
-            monthly_expenses = st.session_state.get("monthly_expenses", 0)
-            FHI = st.session_state.get("FHI", 0)
-            min_fhi = FHI if goal.get("use_recommended_fhi", True) else 50
-
-            delta = (target_date - start_date)
-            months = max(delta.days // 30, 1)
-            remaining_amount = max(goal_amount - current_savings, 0)
-            required_monthly_saving = remaining_amount / months
-            available_to_save = max(monthly_income - monthly_expenses, 0)
-            on_track = required_monthly_saving <= available_to_save and FHI >= min_fhi
-
             with st.container(border=True):
-                # Calculate saved amount based on months checked
-                start_date = goal.get("start_date", date.today())
-                target_date = goal.get("target_date", date.today())
-
-                # Function to get all months between start and target
-                def month_start(d: date) -> date:
-                    return d.replace(day=1)
-
-                def months_between(start: date, target: date):
-                    m = month_start(start)
-                    out = []
-                    while m <= target:
-                        out.append(m)
-                        year = m.year + (m.month // 12)
-                        month = (m.month % 12) + 1
-                        m = m.replace(year=year, month=month, day=1)
-                    return out
-
-                months = months_between(start_date, target_date)
-                total_months = len(months)
-                goal_amount = goal.get("goal_amount", 1000.0)
-                current_savings = st.session_state.get("current_savings", 0)
-
-                # Base per month = evenly split goal - current savings
-                base_pool = max(goal_amount - current_savings, 0.0)
-                base_per_month = base_pool / total_months if total_months > 0 else 0.0
-
-                # Count months marked as saved
-                checked_months = [m for m in months if goal.get("progress", {}).get(m.strftime("%Y-%m"), False)]
-                saved_amount = len(checked_months) * base_per_month
-
-                # Progress as fraction
-                progress = min(saved_amount / goal_amount, 1.0) if goal_amount > 0 else 0
+                idx = i * cols_per_row + j
+                progress = float(plan["progress"][idx])
 
                 st.markdown(
                     f"""
@@ -158,11 +169,82 @@ for i in range(num_rows):
                     """, unsafe_allow_html=True
                 )
                 st.progress(progress)
+                if progress < 1.0:
+                    if plan["feasible"][idx]:
+                        st.caption(f"✅ ₱{plan['allocated_monthly'][idx]:,.0f}/mo allocated")
+                    else:
+                        st.caption(f"⚠️ Short ₱{plan['shortfall_monthly'][idx]:,.0f}/mo")
 
                 if st.button("View", key=f"view_{goal_id}"):
                     st.session_state.selected_goal = goal_id
                     st.rerun()
 
+# Savings allocation across all goals
+if goals:
+    with st.container(border=True):
+        st.subheader("💸 Savings Allocation")
+        surplus = max(st.session_state["monthly_income"] - st.session_state["monthly_expenses"], 0)
+        needed = float(plan["allocated_monthly"].sum() + plan["shortfall_monthly"].sum())
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Available to Save", f"₱{surplus:,.0f}/mo")
+        col2.metric("Needed by All Goals", f"₱{needed:,.0f}/mo")
+        col3.metric("Goals on Track", f"{int(plan['feasible'].sum())} of {len(goals)}")
+        st.caption("Your savings and monthly surplus are shared across goals: higher priority first, "
+                   "then earliest target date.")
+
+        order = plan["order"]
+        st.dataframe(pd.DataFrame({
+            "Goal": [f"{goals[k][1].get('emoji', '🎯')} {goals[k][1]['name']}" for k in order],
+            "Priority": [goals[k][1].get("priority", "Medium") for k in order],
+            "Target": [month_date(plan["deadline"][k]).strftime("%b %Y") for k in order],
+            "Savings Applied": [f"₱{plan['savings_share'][k]:,.0f}" for k in order],
+            "Needs / mo": [f"₱{plan['allocated_monthly'][k] + plan['shortfall_monthly'][k]:,.0f}" for k in order],
+            "Allocated / mo": [f"₱{plan['allocated_monthly'][k]:,.0f}" for k in order],
+            "Status": ["✅ Funded" if plan["feasible"][k] else
+                       ("⛔ Past target date" if plan["open_slots"][k] <= 0 else
+                        f"⚠️ Short ₱{plan['shortfall_monthly'][k]:,.0f}/mo") for k in order],
+        }), hide_index=True, use_container_width=True)
+
+    # Monte Carlo check of every goal against uncertain income, expenses and returns
+    with st.container(border=True):
+        st.subheader("🎲 Will I Make It?")
+        st.caption("Simulates thousands of possible futures where your income, expenses and investment "
+                   "returns vary, and counts how often each goal is fully funded by its target date.")
+        if st.toggle("Run simulation", key="goal_simulation_on"):
+            col1, col2, col3, col4 = st.columns(4)
+            annual_return = col1.slider("Expected return (%/yr)", 0.0, 12.0, 5.0, 0.5, key="sim_return") / 100
+            return_volatility = col2.slider("Return volatility (%/yr)", 0.0, 30.0, 10.0, 1.0, key="sim_return_vol") / 100
+            income_volatility = col3.slider("Income swings (%/mo)", 0.0, 10.0, 3.0, 0.5, key="sim_income_vol") / 100
+            inflation = col4.slider("Expense growth (%/yr)", 0.0, 10.0, 3.5, 0.5, key="sim_inflation") / 100
+
+            sim = simulate_goals([g for _, g in goals], st.session_state["current_savings"],
+                                 st.session_state["monthly_income"], st.session_state["monthly_expenses"],
+                                 annual_return=annual_return, return_volatility=return_volatility,
+                                 income_volatility=income_volatility, expense_drift=inflation / 12, seed=0)
+
+            order = sim["order"]
+            st.dataframe(pd.DataFrame({
+                "Goal": [f"{goals[k][1].get('emoji', '🎯')} {goals[k][1]['name']}" for k in order],
+                "Target": [f"₱{goals[k][1].get('goal_amount', 1000.0):,.0f}" for k in order],
+                "Chance of Success": [f"{sim['probability'][k]:.0%}" for k in order],
+                "Pessimistic (P10)": [f"₱{sim['p10'][k]:,.0f}" for k in order],
+                "Typical (P50)": [f"₱{sim['p50'][k]:,.0f}" for k in order],
+                "Optimistic (P90)": [f"₱{sim['p90'][k]:,.0f}" for k in order],
+            }), hide_index=True, use_container_width=True)
+            st.caption("P10/P50/P90 are the savings left for each goal at its target date, after goals "
+                       "ahead of it in funding order have taken their share.")
+
+            bands = sim["balance_bands"]
+            months = [month_date(sim["start_month"] + t - 1) for t in range(bands.shape[1])]
+            st.line_chart(pd.DataFrame({"P10": bands[0], "P50": bands[1], "P90": bands[2]},
+                                       index=pd.Index(months, name="Month")))
+
+    # Projected vs. actual savings across all goals
+    with st.container(border=True):
+        st.subheader("📈 Savings Timeline")
+        st.caption("Projected follows each goal's monthly schedule; Actual counts the months you've marked as saved.")
+        st.line_chart(combined_timeline([timeline_for(goal_id, plan) for goal_id, _ in goals]))
+
 
 # Show goal details
 if st.session_state.selected_goal:
@@ -170,19 +252,6 @@ if st.session_state.selected_goal:
     goal = st.session_state.goals[goal_id]
     st.markdown("---")
 
-    def month_start(d: date) -> date:
-        return d.replace(day=1)
-
-    def months_between(start: date, target: date):
-        m = month_start(start)
-        out = []
-        while m <= target:
-            out.append(m)
-            year = m.year + (m.month // 12)
-            month = (m.month % 12) + 1
-            m = m.replace(year=year, month=month, day=1)
-        return out
-
     # Roadmap tracker
     # Roadmap tracker
     with st.container(border=True):
@@ -192,9 +261,6 @@ if st.session_state.selected_goal:
             "If you miss a month, the amount rolls over into the next one."
         )
 
-        if "progress" not in goal:
-            goal["progress"] = {}
-
         start_date = goal.get("start_date", date.today())
         target_date = goal.get("target_date", date.today())
 
@@ -205,46 +271,70 @@ if st.session_state.selected_goal:
             st.warning("⚠️ Please set a Start Date earlier than the Target Date.")
             valid_schedule = False
         else:
-            months = months_between(start_date, target_date)
-            if not months:
+            goal_idx = list(st.session_state.goals).index(goal_id)
+            first_month, total_months = int(plan["first_month"][goal_idx]), int(plan["n_months"][goal_idx])
+            if total_months == 0:
                 st.warning("⚠️ No months to show. Adjust your dates.")
                 valid_schedule = False
             else:
+                last_month = first_month + total_months - 1
+
+                # One summary row per year; only the selected year gets checkboxes
+                years = list(range(first_month // 12, last_month // 12 + 1))
+                year_rows = []
+                for year in years:
+                    lo, hi = max(first_month, year * 12), min(last_month, year * 12 + 11)
+                    saved_count, _ = saved_in_range(goal["progress"], lo, hi - lo + 1)
+                    year_rows.append({
+                        "Year": str(year),
+                        "Months Saved": f"{saved_count} / {hi - lo + 1}",
+                        "Status": "✅ Complete" if saved_count == hi - lo + 1 else
+                                  ("🟡 In progress" if saved_count else "⬜ Not started"),
+                    })
+                if len(years) > 1:
+                    st.dataframe(pd.DataFrame(year_rows), hide_index=True, use_container_width=True)
+
+                # Open on the first month that still needs saving
+                next_open = min(first_month + int(plan["last_checked"][goal_idx]) + 1, last_month)
+                year = st.selectbox("Show year", years, index=years.index(next_open // 12),
+                                    key=f"roadmap_year_{goal_id}")
+
                 cols_per_row = 4  # 4 months per row
-                for i, m in enumerate(months):
+                year_months = range(max(first_month, year * 12), min(last_month, year * 12 + 11) + 1)
+                for i, month in enumerate(year_months):
                     if i % cols_per_row == 0:
                         cols = st.columns(cols_per_row, gap="small")
 
                     with cols[i % cols_per_row]:
-                        key = m.strftime("%Y-%m")
-                        if key not in goal["progress"]:
-                            goal["progress"][key] = False
-
                         # Single line checkbox with month and year
-                        label = f"{m.strftime('%b %Y')}"
-                        checked = st.checkbox(label, value=goal["progress"][key], key=f"chk_{goal_id}_{key}")
-                        goal["progress"][key] = checked
-
-                # --- Calculate required monthly saving ---
-                total_months = len(months)
-                base_pool = max(goal.get("goal_amount", 0.0) - st.session_state["current_savings"], 0.0)
-                base_per_month = base_pool / total_months if total_months > 0 else 0.0
-
-                checked_indices = [i for i, m in enumerate(months) if goal["progress"].get(m.strftime("%Y-%m"), False)]
-                last_checked = max(checked_indices) if checked_indices else -1
-                saved_amount = len(checked_indices) * base_per_month
-                remaining_amount = max(base_pool - saved_amount, 0.0)
-
-                future_months = months[last_checked + 1:] if last_checked >= 0 else months
-                open_future_slots = [m for m in future_months if not goal["progress"].get(m.strftime("%Y-%m"), False)]
-
-                required_monthly_saving = remaining_amount / len(open_future_slots) if open_future_slots else 0.0
+                        label = month_date(month).strftime("%b %Y")
+                        st.checkbox(label, value=is_month_saved(goal["progress"], month),
+                                    key=f"chk_{goal_id}_{month_label(month)}",
+                                    on_change=record_month, args=(goal_id, month))
+
+                # Bulk update without rendering every month
+                col1, col2 = st.columns([3, 1], vertical_alignment="bottom")
+                with col1:
+                    st.selectbox("Mark all months saved through", list(range(first_month, last_month + 1)),
+                                 index=next_open - first_month, format_func=lambda m: month_date(m).strftime("%b %Y"),
+                                 key=f"mark_through_{goal_id}")
+                with col2:
+                    st.button("✅ Mark saved", key=f"mark_through_btn_{goal_id}",
+                              on_click=mark_months_through, args=(goal_id, first_month), use_container_width=True)
+
+                # --- Calculate required monthly saving (after this run's checkbox changes) ---
+                plan = current_plan()
+                required_monthly_saving = float(plan["required_monthly"][goal_idx])
+                open_future_slots = int(plan["open_slots"][goal_idx])
 
                 st.info(
                     f"💡 Required savings from now on: ₱{required_monthly_saving:,.2f} "
-                    f"({len(open_future_slots)} month(s) remaining)."
+                    f"({open_future_slots} month(s) remaining)."
                 )
 
+                st.markdown("**📈 Projected vs. Actual**")
+                st.line_chart(timeline_for(goal_id, plan))
+
 
 
     # Goal settings
@@ -272,6 +362,11 @@ if st.session_state.selected_goal:
                                                 value=goal.get("target_date", date.today()),
                                                 key=f"target_date_input_{goal_id}")
 
+        goal["priority"] = st.selectbox("⭐ Priority", PRIORITIES,
+                                        index=PRIORITIES.index(goal.get("priority", "Medium")),
+                                        key=f"priority_input_{goal_id}",
+                                        help="Higher-priority goals get first claim on your savings")
+
         st.markdown("#### Financial Health Setting")
         goal["use_recommended_fhi"] = st.checkbox(
             f"Use your current FHI ({st.session_state.get('FHI', 0)})",
@@ -299,24 +394,32 @@ if st.session_state.selected_goal:
             st.warning("⚠️ Fix your dates above to see an accurate status check.")
         else:
             available_to_save = max(monthly_income - monthly_expenses, 0)
-            if required_monthly_saving <= available_to_save and FHI >= min_fhi:
+
+            # This goal's share of the surplus after higher-priority and earlier goals
+            plan = current_plan()
+            goal_available = float(plan["allocated_monthly"][goal_idx])
+            required_monthly_saving = float(plan["required_monthly"][goal_idx])
+            if plan["feasible"][goal_idx] and FHI >= min_fhi:
                 st.success(f"✅ You're on track! Save ₱{required_monthly_saving:,.2f} per month.")
             else:
                 st.error("🚨 You're not on track.")
                 st.markdown(f"💡 Need to save: ₱{required_monthly_saving:,.2f}/month")
-                st.markdown(f"⚠️ Can only save: ₱{available_to_save:,.2f}/month")
+                st.markdown(f"⚠️ Can only save: ₱{goal_available:,.2f}/month for this goal "
+                            f"(₱{available_to_save:,.2f}/month shared across all goals)")
 
                 # Suggestions section
                 st.subheader("Suggestions 💡")
                 if available_to_save <= 0:
                     st.warning("👉 Your expenses are equal to or greater than your income. Consider reducing expenses or increasing income sources.")
-                elif required_monthly_saving > available_to_save:
-                    st.info("👉 Try adjusting your goal: either increase your saving contributions, extend your target date, or lower your target amount.")
+                elif required_monthly_saving > goal_available:
+                    st.info("👉 Try adjusting your goal: either increase your saving contributions, extend your target date, lower your target amount, or raise its priority.")
                 if FHI < min_fhi:
                     st.warning("👉 Your Financial Health Index is too low. Focus on improving income-expense balance before setting aggressive savings goals.")
-                if required_monthly_saving - available_to_save <= 1000:
+                if required_monthly_saving - goal_available <= 1000:
                     st.success("👉 You're close! Small tweaks in spending could put you back on track.")
 
     if st.button("💾 Save Goal", key=f"save_goal_{goal_id}"):
+        if user_id:
+            save_goal(user_id, goal_id, goal)
         st.session_state.selected_goal = None
         st.rerun()
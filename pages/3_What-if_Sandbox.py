@@ -5,6 +5,14 @@ import pandas as pd
 import base64
 from datetime import datetime
 
+import numpy as np
+
+from fhi_engine import (FHI_BASE, FHI_WEIGHTS, LEVER_INPUTS, SCENARIO_LEVERS, SEPARABLE_LEVERS, apply_scenario,
+                        best_next_peso, calculate_fhi, cheapest_mix, evaluate_scenarios, event_paths, goal_seek,
+                        project_scenarios, scenario_id, stress_test_fhi, sweep_fhi)
+from figures import comparison_radar, component_deltas
+from storage import delete_scenario, load_scenarios, save_scenario
+
 def get_base64_image(image_path):
     with open(image_path, "rb") as f:
         data = f.read()
@@ -58,48 +66,9 @@ st.markdown(
 # CALCULATION & HELPER FUNCTIONS
 # ===============================
 
-def calculate_fhi(age, monthly_income, monthly_expenses, monthly_savings, monthly_debt,
-                  total_investments, net_worth, emergency_fund):
-    """Calculate FHI score and components"""
-    if age < 30:
-        alpha, beta = 2.5, 2.0
-    elif age < 40:
-        alpha, beta = 3.0, 3.0
-    elif age < 50:
-        alpha, beta = 3.5, 4.0
-    else:
-        alpha, beta = 4.0, 5.0
-
-    annual_income = monthly_income * 12
-
-    Nworth = min(max((net_worth / (annual_income * alpha)) * 100, 0), 100) if annual_income > 0 else 0
-    DTI = 100 - min((monthly_debt / monthly_income) * 100, 100) if monthly_income > 0 else 0
-    Srate = min((monthly_savings / monthly_income) * 100, 100) if monthly_income > 0 else 0
-    Invest = min(max((total_investments / (beta * annual_income)) * 100, 0), 100) if annual_income > 0 else 0
-    Emerg = min((emergency_fund / monthly_expenses) / 6 * 100, 100) if monthly_expenses > 0 else 0
-
-    FHI = 0.20 * Nworth + 0.15 * DTI + 0.15 * Srate + 0.15 * Invest + 0.20 * Emerg + 15
-
-    components = {
-        "Net Worth": Nworth,
-        "Debt-to-Income": DTI,
-        "Savings Rate": Srate,
-        "Investment": Invest,
-        "Emergency Fund": Emerg,
-    }
-
-    return FHI, components
-
 def get_component_weights():
     """Return FHI component weights"""
-    return {
-        "Net Worth": 0.20,
-        "Debt-to-Income": 0.15,
-        "Savings Rate": 0.15,
-        "Investment": 0.15,
-        "Emergency Fund": 0.20,
-        "_base": 15.0,
-    }
+    return {**FHI_WEIGHTS, "_base": FHI_BASE}
 
 def top_component_changes(old_components, new_components, k=2):
     """Identify the biggest movers for narrative explainability"""
@@ -115,58 +84,34 @@ def explain_fhi(components):
     total_weighted = round(sum(contrib.values()), 2)
     return contrib, total_weighted, w["_base"]
 
-def create_comparison_chart(base_comp, new_comp):
-    """Create a comparison chart for components"""
-    try:
-        categories = list(base_comp.keys())
-        base_values = [float(v) if v is not None else 0.0 for v in base_comp.values()]
-        new_values = [float(v) if v is not None else 0.0 for v in new_comp.values()]
-        
-        fig = go.Figure()
-        
-        fig.add_trace(go.Scatterpolar(
-            r=base_values,
-            theta=categories,
-            fill='toself',
-            name='Current',
-            line_color='blue',
-            opacity=0.6
-        ))
-        
-        fig.add_trace(go.Scatterpolar(
-            r=new_values,
-            theta=categories,
-            fill='toself',
-            name='Scenario',
-            line_color='red',
-            opacity=0.6
-        ))
-        
-        fig.update_layout(
-            polar=dict(
-                radialaxis=dict(visible=True, range=[0, 100])
-            ),
-            showlegend=True,
-            height=400,
-            title="Current vs Scenario Comparison"
-        )
-        
-        return fig
-    except Exception as e:
-        # Fallback: simple bar chart if radar fails
-        import plotly.express as px
-        import pandas as pd
-        
-        df = pd.DataFrame({
-            'Component': categories,
-            'Current': base_values,
-            'Scenario': new_values
-        })
-        
-        fig = px.bar(df, x='Component', y=['Current', 'Scenario'], 
-                     title="Current vs Scenario Comparison",
-                     barmode='group')
-        return fig
+@st.cache_data(max_entries=32, show_spinner=False)
+def run_stress_test(profile_items, lever_items, n_samples, volatilities, correlations, seed):
+    """Cached stress test, keyed on the profile, scenario, shock settings and seed"""
+    income_vol, expense_vol, market_vol = volatilities
+    income_market, income_expense = correlations
+    return stress_test_fhi(dict(profile_items), n_samples=n_samples, income_volatility=income_vol,
+                           expense_volatility=expense_vol, market_volatility=market_vol,
+                           income_market_correlation=income_market, income_expense_correlation=income_expense,
+                           seed=seed, **dict(lever_items))
+
+# Quick scenarios: button label -> (scenario name, help text, parameters)
+QUICK_PRESETS = {
+    "📉 Job Loss (2 months)": ("2-Month Job Loss", "Model a 2-month period without income",
+                               {"income_pct": -100, "savings_pct": -100}),
+    "📈 Salary Raise (+15%)": ("15% Salary Raise", "15% increase in monthly income", {"income_pct": 15}),
+    "💳 Debt Payoff": ("Extra Debt Payment", "Pay off ₱5,000 additional debt monthly", {"debt_abs_delta": -5000}),
+    "🏦 Start Investing": ("Start Investment Plan", "Begin investing ₱3,000 monthly",
+                          {"savings_abs_delta": 3000, "invest_pct": 20}),
+}
+
+# Quick scenarios as timed events for the month-by-month projection
+TIMELINE_PRESETS = {
+    "📉 Job Loss (2 months)": [{"levers": {"income_pct": -100, "savings_pct": -100}, "start": 0, "duration": 2}],
+    "📉 Job Loss (6 months)": [{"levers": {"income_pct": -100, "savings_pct": -100}, "start": 0, "duration": 6}],
+    "📈 Salary Raise (+15%)": [{"levers": {"income_pct": 15}, "start": 0}],
+    "💳 Debt Payoff": [{"levers": {"debt_abs_delta": -5000}, "start": 0}],
+    "🏦 Start Investing": [{"levers": {"savings_abs_delta": 3000, "invest_pct": 20}, "start": 0}],
+}
 
 # ===============================
 # MAIN APPLICATION
@@ -207,142 +152,119 @@ st.success(f"✅ Current FHI Score: **{current_fhi:.1f}/100**")
 # SCENARIO PRESETS
 # ===============================
 
+# Scenario controls live in keyed widget state, so presets and saved scenarios can set them
+for lever in SCENARIO_LEVERS:
+    st.session_state.setdefault(f"sandbox_{lever}", 0)
+st.session_state.setdefault("sandbox_savings_abs_delta", 0)
+st.session_state.setdefault("sandbox_debt_abs_delta", 0)
+st.session_state.setdefault("sandbox_preset", None)
+
+def apply_scenario_params(params, name=None):
+    """Drive the scenario sliders from a parameter record (preset or saved scenario)"""
+    for lever in SCENARIO_LEVERS:
+        st.session_state[f"sandbox_{lever}"] = int(params.get(lever, 0))
+    st.session_state["sandbox_savings_abs_delta"] = params.get("savings_abs_delta", 0)
+    st.session_state["sandbox_debt_abs_delta"] = params.get("debt_abs_delta", 0)
+    st.session_state["sandbox_preset"] = name
+
+def clear_preset_name():
+    st.session_state["sandbox_preset"] = None
+
 with st.container(border=True):
     st.subheader("🚀 Quick Scenarios")
     st.caption("Click any scenario to instantly see the impact on your FHI score")
     
     col1, col2, col3, col4 = st.columns(4)
     
-    preset = None
-    
-    with col1:
-        if st.button("📉 Job Loss (2 months)", help="Model a 2-month period without income"):
-            preset = {
-                "name": "2-Month Job Loss",
-                "income_pct": -100,
-                "expenses_pct": 0,
-                "savings_pct": -100,
-                "debt_pct": 0,
-                "invest_pct": 0,
-                "efund_pct": 0
-            }
-    
-    with col2:
-        if st.button("📈 Salary Raise (+15%)", help="15% increase in monthly income"):
-            preset = {
-                "name": "15% Salary Raise",
-                "income_pct": 15,
-                "expenses_pct": 0,
-                "savings_pct": 0,
-                "debt_pct": 0,
-                "invest_pct": 0,
-                "efund_pct": 0
-            }
-    
-    with col3:
-        if st.button("💳 Debt Payoff", help="Pay off ₱5,000 additional debt monthly"):
-            preset = {
-                "name": "Extra Debt Payment",
-                "income_pct": 0,
-                "expenses_pct": 0,
-                "savings_pct": 0,
-                "debt_abs_delta": -5000,
-                "invest_pct": 0,
-                "efund_pct": 0
-            }
-    
-    with col4:
-        if st.button("🏦 Start Investing", help="Begin investing ₱3,000 monthly"):
-            preset = {
-                "name": "Start Investment Plan",
-                "income_pct": 0,
-                "expenses_pct": 0,
-                "savings_abs_delta": 3000,
-                "debt_pct": 0,
-                "invest_pct": 20,
-                "efund_pct": 0
-            }
+    for col, (button_label, (name, help_text, params)) in zip((col1, col2, col3, col4), QUICK_PRESETS.items()):
+        with col:
+            st.button(button_label, help=help_text, on_click=apply_scenario_params, args=(params, name))
 
 # ===============================
 # CUSTOM SCENARIO BUILDER
 # ===============================
 
+slider_help = {
+    "income_pct": "Percentage change in monthly income",
+    "expenses_pct": "Percentage change in monthly expenses",
+    "savings_pct": "Percentage change in monthly savings",
+    "debt_pct": "Percentage change in monthly debt payments",
+    "invest_pct": "Percentage change in total investments",
+    "efund_pct": "Percentage change in emergency fund",
+}
+
+def scenario_slider(lever):
+    label, lo, hi = SCENARIO_LEVERS[lever]
+    return st.slider(label, lo, hi, step=1, key=f"sandbox_{lever}", help=slider_help[lever],
+                     on_change=clear_preset_name)
+
 with st.container(border=True):
     st.subheader("🎛️ Custom Scenario Builder")
     st.caption("Adjust any financial parameter to see how it affects your FHI score")
     
-    # Apply preset values if selected
-    if preset:
-        st.info(f"📋 Applied preset: **{preset['name']}**")
+    # Handle absolute deltas from presets
+    debt_abs_delta = st.session_state["sandbox_debt_abs_delta"]
+    savings_abs_delta = st.session_state["sandbox_savings_abs_delta"]
+
+    if st.session_state["sandbox_preset"]:
+        st.info(f"📋 Applied preset: **{st.session_state['sandbox_preset']}**")
+    if debt_abs_delta or savings_abs_delta:
+        adjustments = []
+        if savings_abs_delta: adjustments.append(f"savings {savings_abs_delta:+,.0f} ₱/mo")
+        if debt_abs_delta: adjustments.append(f"debt payments {debt_abs_delta:+,.0f} ₱/mo")
+        st.caption(f"Includes fixed adjustments: {', '.join(adjustments)}")
     
     col1, col2, col3 = st.columns(3)
     
     with col1:
         st.markdown("**Income & Expenses**")
-        income_pct = st.slider(
-            "Income Change (%)", 
-            -50, 50, 
-            preset.get("income_pct", 0) if preset else 0, 
-            step=1,
-            help="Percentage change in monthly income"
-        )
-        expenses_pct = st.slider(
-            "Expenses Change (%)", 
-            -30, 30, 
-            preset.get("expenses_pct", 0) if preset else 0, 
-            step=1,
-            help="Percentage change in monthly expenses"
-        )
+        income_pct = scenario_slider("income_pct")
+        expenses_pct = scenario_slider("expenses_pct")
     
     with col2:
         st.markdown("**Savings & Debt**")
-        savings_pct = st.slider(
-            "Savings Change (%)", 
-            -50, 50, 
-            preset.get("savings_pct", 0) if preset else 0, 
-            step=1,
-            help="Percentage change in monthly savings"
-        )
-        debt_pct = st.slider(
-            "Debt Payments Change (%)", 
-            -30, 50, 
-            preset.get("debt_pct", 0) if preset else 0, 
-            step=1,
-            help="Percentage change in monthly debt payments"
-        )
+        savings_pct = scenario_slider("savings_pct")
+        debt_pct = scenario_slider("debt_pct")
     
     with col3:
         st.markdown("**Investments & Emergency**")
-        invest_pct = st.slider(
-            "Investment Growth (%)", 
-            -30, 50, 
-            preset.get("invest_pct", 0) if preset else 0, 
-            step=1,
-            help="Percentage change in total investments"
-        )
-        efund_pct = st.slider(
-            "Emergency Fund Change (%)", 
-            -30, 50, 
-            preset.get("efund_pct", 0) if preset else 0, 
-            step=1,
-            help="Percentage change in emergency fund"
-        )
-    
-    # Handle absolute deltas from presets
-    debt_abs_delta = preset.get("debt_abs_delta", 0) if preset else 0
-    savings_abs_delta = preset.get("savings_abs_delta", 0) if preset else 0
+        invest_pct = scenario_slider("invest_pct")
+        efund_pct = scenario_slider("efund_pct")
+
+    st.button("↺ Reset to current", key="sandbox_reset", on_click=apply_scenario_params, args=({},))
 
 # ===============================
 # SCENARIO CALCULATION
 # ===============================
 
+current_profile = {
+    "age": current_age,
+    "income": current_income,
+    "expenses": current_expenses,
+    "savings": current_savings,
+    "debt": current_debt,
+    "total_investments": current_investments,
+    "net_worth": current_networth,
+    "emergency_fund": current_emergency,
+}
+scenario_levers = {
+    "income_pct": income_pct,
+    "expenses_pct": expenses_pct,
+    "savings_pct": savings_pct,
+    "debt_pct": debt_pct,
+    "invest_pct": invest_pct,
+    "efund_pct": efund_pct,
+}
+
 # Calculate scenario values
-scenario_income = max(0.0, current_income * (1 + income_pct/100))
-scenario_expenses = max(0.0, current_expenses * (1 + expenses_pct/100))
-scenario_savings = max(0.0, current_savings * (1 + savings_pct/100) + savings_abs_delta)
-scenario_debt = max(0.0, current_debt * (1 + debt_pct/100) + debt_abs_delta)
-scenario_investments = max(0.0, current_investments * (1 + invest_pct/100))
-scenario_emergency = max(0.0, current_emergency * (1 + efund_pct/100))
+scenario = apply_scenario(current_profile, savings_abs_delta=savings_abs_delta, debt_abs_delta=debt_abs_delta,
+                          **scenario_levers)
+scenario_income = float(scenario["income"])
+scenario_expenses = float(scenario["expenses"])
+scenario_savings = float(scenario["savings"])
+scenario_debt = float(scenario["debt"])
+scenario_investments = float(scenario["total_investments"])
+scenario_emergency = float(scenario["emergency_fund"])
 
 # Calculate new FHI
 new_fhi, new_components = calculate_fhi(
@@ -447,7 +369,7 @@ col1, col2 = st.columns(2)
 with col1:
     # Radar chart comparison
     st.plotly_chart(
-        create_comparison_chart(current_components, new_components), 
+        comparison_radar(tuple(current_components.items()), tuple(new_components.items())), 
         use_container_width=True
     )
 
@@ -481,6 +403,220 @@ with col2:
     else:
         st.error(f"🚨 This scenario would significantly impact your financial health (-{abs(fhi_change):.1f} points).")
 
+# ===============================
+# PARAMETER SWEEP
+# ===============================
+
+with st.container(border=True):
+    st.subheader("🗺️ Parameter Sweep")
+    st.caption("See your FHI across every combination of two parameters. "
+               "All other parameters stay at the values set above.")
+
+    lever_names = list(SCENARIO_LEVERS)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        x_lever = st.selectbox("Horizontal axis", lever_names, index=0,
+                               format_func=lambda k: SCENARIO_LEVERS[k][0], key="sweep_x")
+    with col2:
+        y_lever = st.selectbox("Vertical axis", [k for k in lever_names if k != x_lever], index=0,
+                               format_func=lambda k: SCENARIO_LEVERS[k][0], key="sweep_y")
+    with col3:
+        resolution = st.slider("Grid resolution", 50, 300, 200, step=50, key="sweep_resolution")
+
+    x_values = np.linspace(*SCENARIO_LEVERS[x_lever][1:], resolution)
+    y_values = np.linspace(*SCENARIO_LEVERS[y_lever][1:], resolution)
+    held = {k: v for k, v in scenario_levers.items() if k not in (x_lever, y_lever)}
+    grid = sweep_fhi(current_profile, x_lever, x_values, y_lever, y_values,
+                     savings_abs_delta=savings_abs_delta, debt_abs_delta=debt_abs_delta, **held)
+
+    sweep_fig = go.Figure(go.Contour(
+        x=x_values, y=y_values, z=grid, colorscale="RdYlGn", zmin=0, zmax=100,
+        contours=dict(showlabels=True), colorbar=dict(title="FHI"),
+        hovertemplate=f"{SCENARIO_LEVERS[x_lever][0]}: %{{x:.0f}}<br>"
+                      f"{SCENARIO_LEVERS[y_lever][0]}: %{{y:.0f}}<br>FHI: %{{z:.1f}}<extra></extra>",
+    ))
+    sweep_fig.add_trace(go.Scatter(
+        x=[scenario_levers[x_lever]], y=[scenario_levers[y_lever]], mode="markers",
+        marker=dict(size=12, color="black", symbol="x"), name="Your scenario",
+    ))
+    sweep_fig.update_layout(xaxis_title=SCENARIO_LEVERS[x_lever][0], yaxis_title=SCENARIO_LEVERS[y_lever][0],
+                            height=450, margin=dict(t=20, b=20))
+    st.plotly_chart(sweep_fig, use_container_width=True)
+
+# ===============================
+# SCENARIO TIMELINE
+# ===============================
+
+with st.container(border=True):
+    st.subheader("⏳ Scenario Timeline")
+    st.caption("Plays scenarios out month by month: savings refill your emergency fund and then go to "
+               "investments, shortfalls drain the emergency fund first, and your FHI is re-scored every month.")
+
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        timeline_presets = st.multiselect("Compare with", list(TIMELINE_PRESETS),
+                                          default=list(TIMELINE_PRESETS)[:2], key="timeline_presets")
+    with col2:
+        horizon_years = st.slider("Years", 1, 10, 2, key="timeline_years")
+    annual_return = st.slider("Investment return (%/yr)", 0.0, 12.0, 5.0, 0.5, key="timeline_return") / 100
+
+    horizon = horizon_years * 12
+    timeline_names = ["No change", "Your scenario"] + timeline_presets
+    your_events = [{"levers": {**scenario_levers, "savings_abs_delta": savings_abs_delta,
+                               "debt_abs_delta": debt_abs_delta}, "start": 0}]
+    timeline = project_scenarios(
+        current_profile,
+        [event_paths([], horizon), event_paths(your_events, horizon)]
+        + [event_paths(TIMELINE_PRESETS[name], horizon) for name in timeline_presets],
+        annual_return=annual_return,
+    )
+
+    month_axis = np.arange(horizon + 1)
+    fhi_tab, efund_tab, networth_tab = st.tabs(["FHI", "Emergency Fund", "Net Worth"])
+    for tab, key, title in ((fhi_tab, "fhi", "FHI"), (efund_tab, "emergency_fund", "Emergency Fund (₱)"),
+                            (networth_tab, "net_worth", "Net Worth (₱)")):
+        with tab:
+            timeline_fig = go.Figure([go.Scatter(x=month_axis, y=timeline[key][i], mode="lines", name=name)
+                                      for i, name in enumerate(timeline_names)])
+            timeline_fig.update_layout(xaxis_title="Months from now", yaxis_title=title, height=380,
+                                       margin=dict(t=20, b=20))
+            st.plotly_chart(timeline_fig, use_container_width=True)
+
+    # Lowest point and where each scenario ends up
+    lowest = timeline["fhi"].min(axis=1)
+    st.dataframe([
+        {
+            "Scenario": name,
+            "Lowest FHI": f"{lowest[i]:.1f}",
+            "Lowest In": f"Month {int(timeline['fhi'][i].argmin())}",
+            f"FHI After {horizon_years} yr": f"{timeline['fhi'][i, -1]:.1f}",
+            "Emergency Fund Low": f"₱{timeline['emergency_fund'][i].min():,.0f}",
+            f"Net Worth After {horizon_years} yr": f"₱{timeline['net_worth'][i, -1]:,.0f}",
+        }
+        for i, name in enumerate(timeline_names)
+    ], use_container_width=True, hide_index=True)
+
+# ===============================
+# STRESS TEST
+# ===============================
+
+with st.container(border=True):
+    st.subheader("🎲 Stress Test")
+    st.caption("Shakes your scenario with thousands of random, correlated shocks to income, expenses and "
+               "investment value, and shows how your FHI could land.")
+
+    if st.toggle("Run stress test", key="stress_on"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            income_vol = st.slider("Income swings (%)", 0, 50, 15, key="stress_income_vol") / 100
+            income_market = st.slider("Income ↔ market link", -1.0, 1.0, 0.4, 0.1, key="stress_income_market",
+                                      help="Positive means income tends to fall when markets fall")
+        with col2:
+            expense_vol = st.slider("Expense swings (%)", 0, 50, 10, key="stress_expense_vol") / 100
+            income_expense = st.slider("Income ↔ expense link", -1.0, 1.0, 0.2, 0.1, key="stress_income_expense")
+        with col3:
+            market_vol = st.slider("Market swings (%)", 0, 60, 20, key="stress_market_vol") / 100
+            n_samples = st.select_slider("Samples", [1000, 5000, 10000, 20000], 5000, key="stress_samples")
+        seed = int(st.number_input("Random seed", 0, 10_000, 0, key="stress_seed",
+                                   help="Same seed, same results"))
+
+        stress_levers = {**scenario_levers, "savings_abs_delta": savings_abs_delta, "debt_abs_delta": debt_abs_delta}
+        stress = run_stress_test(tuple(current_profile.items()), tuple(stress_levers.items()), n_samples,
+                                 (income_vol, expense_vol, market_vol), (income_market, income_expense), seed)
+
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Bad Case (P5)", f"{stress['p5']:.1f}")
+        col2.metric("Typical (P50)", f"{stress['p50']:.1f}", delta=f"{stress['p50'] - new_fhi:+.1f} vs scenario")
+        col3.metric("Good Case (P95)", f"{stress['p95']:.1f}")
+        col4.metric("Chance Below 50", f"{stress['prob_below_50']:.0%}")
+
+        stress_fig = px.histogram(x=stress["samples"], nbins=60, labels={"x": "FHI"},
+                                  title=f"FHI Across {n_samples:,} Simulated Outcomes")
+        stress_fig.add_vline(x=50, line_dash="dash", line_color="red", annotation_text="50")
+        stress_fig.add_vline(x=new_fhi, line_color="black", annotation_text="Scenario")
+        stress_fig.update_layout(yaxis_title="Outcomes", showlegend=False, height=350, margin=dict(t=40, b=20))
+        st.plotly_chart(stress_fig, use_container_width=True)
+
+# ===============================
+# GOAL SEEK
+# ===============================
+
+with st.container(border=True):
+    st.subheader("🎯 Goal Seek")
+    st.caption("Pick a target score and see exactly how much each parameter would need to change, "
+               "starting from your current profile.")
+
+    profile_fhi_now = calculate_fhi(current_age, current_income, current_expenses, current_savings,
+                                    current_debt, current_investments, current_networth, current_emergency)[0]
+    target_fhi = st.slider("Target FHI", 0.0, 100.0, float(min(round(profile_fhi_now) + 10, 100)), step=0.5,
+                           key="goal_seek_target")
+
+    # One lever at a time, over each slider's range
+    solutions = goal_seek(current_profile, target_fhi)
+    seek_rows = []
+    for lever, result in solutions.items():
+        current_value = current_profile[LEVER_INPUTS[lever]]
+        if result["pct"] is None:
+            needed, new_value = "Not reachable alone", f"Best FHI: {result['max_fhi']:.1f}"
+        else:
+            needed, new_value = f"{result['pct']:+.1f}%", f"₱{current_value * (1 + result['pct'] / 100):,.0f}"
+        seek_rows.append({
+            "Parameter": SCENARIO_LEVERS[lever][0].replace(" (%)", ""),
+            "Current": f"₱{current_value:,.0f}",
+            "Change Needed": needed,
+            "New Value": new_value,
+        })
+    st.markdown("**Single-parameter changes**")
+    st.dataframe(seek_rows, use_container_width=True, hide_index=True)
+
+    # Cheapest combination of the levers that each move one component
+    st.markdown("**Smallest combined change**")
+    st.caption("Combines savings, debt, investments and emergency fund with the fewest total percentage "
+               "points of change. Set how far you're willing to move each one:")
+    limit_cols = st.columns(len(SEPARABLE_LEVERS))
+    max_changes = {}
+    for col, lever in zip(limit_cols, SEPARABLE_LEVERS):
+        label, lo, hi = SCENARIO_LEVERS[lever]
+        limit = abs(lo) if lever == "debt_pct" else hi
+        with col:
+            max_changes[lever] = st.slider(f"Max {label.replace(' (%)', '').lower()} (%)", 0, limit, limit,
+                                           key=f"goal_seek_limit_{lever}")
+
+    mix = cheapest_mix(current_profile, target_fhi, max_changes)
+    mix_changes = [f"{SCENARIO_LEVERS[k][0].replace(' (%)', '')} {v:+.1f}%" for k, v in mix["changes"].items() if v]
+    if mix["feasible"]:
+        if mix_changes:
+            st.success(f"✅ Reach FHI {target_fhi:.1f} with: " + " • ".join(mix_changes))
+        else:
+            st.success(f"✅ Your current FHI already meets {target_fhi:.1f}.")
+    else:
+        st.warning(f"⚠️ Within these limits the best reachable FHI is {mix['fhi']:.1f}"
+                   + (f" ({' • '.join(mix_changes)})." if mix_changes else ".")
+                   + " Loosen a limit or change income or expenses too.")
+
+# ===============================
+# BEST NEXT PESO
+# ===============================
+
+with st.container(border=True):
+    st.subheader("🪙 Best Next Peso")
+    st.caption("Where ₱1,000 does the most for your FHI under this scenario, from the exact marginal "
+               "effect of each input. Components already at their limit gain nothing.")
+    current_ranking = {key: points for key, _, points in best_next_peso(current_profile)}
+    peso_rows = [
+        {
+            "Rank": i + 1,
+            "Action": label,
+            "Scenario Gain per ₱1,000": f"+{points:.2f}",
+            "Current Gain per ₱1,000": f"+{current_ranking.get(key, 0.0):.2f}",
+        }
+        for i, (key, label, points) in enumerate(best_next_peso(scenario))
+    ]
+    if peso_rows:
+        st.dataframe(peso_rows, use_container_width=True, hide_index=True)
+    else:
+        st.success("Every component is already at its maximum in this scenario.")
+
 # ===============================
 # EXPLAINABILITY SECTION
 # ===============================
@@ -562,16 +698,36 @@ if fhi_change != 0:
             if expenses_pct > 0:
                 st.write("⚠️ **Expense Management**: Create strict budget, identify cost-cutting opportunities")
 
+# ===============================
+# SAVED SCENARIOS
+# ===============================
+
+user_id = st.session_state.get("user_id")
+if "saved_scenarios" not in st.session_state:
+    st.session_state.saved_scenarios = []
+
+# Load saved scenarios once per signed-in user
+if user_id and st.session_state.get("scenarios_loaded_for") != user_id:
+    stored = load_scenarios(user_id)
+    if stored is not None:
+        session_ids = {sc["id"] for sc in st.session_state.saved_scenarios}
+        st.session_state.saved_scenarios = [sc for sc in stored if sc["id"] not in session_ids] \
+            + st.session_state.saved_scenarios
+    # Record the attempt even on failure so a broken sheet is not re-read on every rerun
+    st.session_state.scenarios_loaded_for = user_id
+
+def remove_saved_scenario(scenario_id):
+    st.session_state.saved_scenarios = [sc for sc in st.session_state.saved_scenarios if sc["id"] != scenario_id]
+    if user_id:
+        delete_scenario(user_id, scenario_id)
+
 # Save scenario functionality
 if st.button("💾 Save This Scenario", key="save_scenario"):
-    if "saved_scenarios" not in st.session_state:
-        st.session_state.saved_scenarios = []
-    
     # Create detailed scenario name if it's custom
-    scenario_name = preset.get("name", "Custom Scenario") if preset else "Custom Scenario"
+    scenario_name = st.session_state["sandbox_preset"] or "Custom Scenario"
     
     # Add descriptive suffix for custom scenarios
-    if not preset:
+    if not st.session_state["sandbox_preset"]:
         changes = []
         if income_pct != 0: changes.append(f"Income {income_pct:+}%")
         if expenses_pct != 0: changes.append(f"Expenses {expenses_pct:+}%")
@@ -583,96 +739,138 @@ if st.button("💾 Save This Scenario", key="save_scenario"):
         if changes:
             scenario_name = f"Custom: {', '.join(changes[:2])}" + ("..." if len(changes) > 2 else "")
     
+    # Only the parameters are stored; FHI is recomputed against the current profile
+    params = {k: v for k, v in {**scenario_levers, "savings_abs_delta": savings_abs_delta,
+                                "debt_abs_delta": debt_abs_delta}.items() if v}
     scenario_data = {
+        "id": scenario_id(params),
         "name": scenario_name,
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "current_fhi": current_fhi,
-        "scenario_fhi": new_fhi,
-        "change": fhi_change,
-        "parameters": {
-            "income_pct": income_pct,
-            "expenses_pct": expenses_pct,
-            "savings_pct": savings_pct,
-            "debt_pct": debt_pct,
-            "invest_pct": invest_pct,
-            "efund_pct": efund_pct
-        },
-        "absolute_values": {
-            "current_income": current_income,
-            "scenario_income": scenario_income,
-            "current_expenses": current_expenses,
-            "scenario_expenses": scenario_expenses,
-            "current_savings": current_savings,
-            "scenario_savings": scenario_savings,
-            "current_debt": current_debt,
-            "scenario_debt": scenario_debt,
-            "current_investments": current_investments,
-            "scenario_investments": scenario_investments,
-            "current_emergency": current_emergency,
-            "scenario_emergency": scenario_emergency
-        },
-        "preset_adjustments": {
-            "debt_abs_delta": debt_abs_delta,
-            "savings_abs_delta": savings_abs_delta
-        }
+        "params": params,
+        "saved_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
     }
-    
-    st.session_state.saved_scenarios.append(scenario_data)
-    st.success("✅ Scenario saved! You can review saved scenarios below.")
+
+    if any(sc["id"] == scenario_data["id"] for sc in st.session_state.saved_scenarios):
+        st.info("ℹ️ This scenario is already saved.")
+    else:
+        st.session_state.saved_scenarios.append(scenario_data)
+        if user_id:
+            save_scenario(user_id, scenario_data)
+        st.success("✅ Scenario saved! You can review saved scenarios below.")
 
 # Display saved scenarios
 if st.session_state.get("saved_scenarios"):
     with st.expander("📁 Saved Scenarios", expanded=False):
-        for i, scenario in enumerate(st.session_state.saved_scenarios):
+        saved = st.session_state.saved_scenarios
+        # Every saved scenario scored against today's profile in one pass
+        batch = evaluate_scenarios(current_profile, [sc["params"] for sc in saved])
+        batch_fhi = batch["fhi"]
+        values = batch["values"]
+
+        st.dataframe([
+            {
+                "Scenario": sc["name"],
+                "FHI": f"{batch_fhi[i]:.1f}",
+                "Change": f"{batch_fhi[i] - current_fhi:+.1f}",
+                "Income": f"₱{values['income'][i]:,.0f}",
+                "Expenses": f"₱{values['expenses'][i]:,.0f}",
+                "Savings": f"₱{values['savings'][i]:,.0f}",
+                "ID": sc["id"],
+            }
+            for i, sc in enumerate(saved)
+        ], use_container_width=True, hide_index=True)
+        if not user_id:
+            st.caption("🔒 Sign in to keep your saved scenarios between visits.")
+
+        for i, scenario in enumerate(saved):
             with st.container(border=True):
                 col1, col2, col3 = st.columns([3, 2, 1])
                 
                 with col1:
                     st.markdown(f"**{scenario['name']}**")
-                    st.caption(f"Saved: {scenario['timestamp']}")
+                    st.caption(f"Saved: {scenario['saved_at']} • ID {scenario['id']}")
                     
                     # Show parameter details
-                    params = scenario['parameters']
-                    param_details = []
-                    if params['income_pct'] != 0: param_details.append(f"Income: {params['income_pct']:+}%")
-                    if params['expenses_pct'] != 0: param_details.append(f"Expenses: {params['expenses_pct']:+}%")
-                    if params['savings_pct'] != 0: param_details.append(f"Savings: {params['savings_pct']:+}%")
-                    if params['debt_pct'] != 0: param_details.append(f"Debt: {params['debt_pct']:+}%")
-                    if params['invest_pct'] != 0: param_details.append(f"Investments: {params['invest_pct']:+}%")
-                    if params['efund_pct'] != 0: param_details.append(f"Emergency Fund: {params['efund_pct']:+}%")
+                    params = scenario['params']
+                    param_details = [f"{SCENARIO_LEVERS[k][0].replace(' Change (%)', '').replace(' (%)', '')}: "
+                                     f"{params[k]:+}%" for k in SCENARIO_LEVERS if params.get(k)]
+                    if params.get("savings_abs_delta"):
+                        param_details.append(f"Savings: {params['savings_abs_delta']:+,.0f} ₱/mo")
+                    if params.get("debt_abs_delta"):
+                        param_details.append(f"Debt: {params['debt_abs_delta']:+,.0f} ₱/mo")
                     
                     if param_details:
                         st.caption(f"Changes: {' • '.join(param_details)}")
                 
                 with col2:
-                    change_color = "green" if scenario['change'] > 0 else "red"
-                    st.markdown(f"**FHI Impact:** {scenario['scenario_fhi']:.1f}")
-                    st.markdown(f"<span style='color:{change_color}'>{scenario['change']:+.1f} points</span>", unsafe_allow_html=True)
+                    change = batch_fhi[i] - current_fhi
+                    change_color = "green" if change > 0 else "red"
+                    st.markdown(f"**FHI Impact:** {batch_fhi[i]:.1f}")
+                    st.markdown(f"<span style='color:{change_color}'>{change:+.1f} points</span>", unsafe_allow_html=True)
                     
-                    # Show key absolute values if available
-                    if 'absolute_values' in scenario:
-                        abs_vals = scenario['absolute_values']
-                        with st.expander("💰 Scenario Values"):
-                            st.write(f"**Income:** ₱{abs_vals['current_income']:,.0f} → ₱{abs_vals['scenario_income']:,.0f}")
-                            st.write(f"**Expenses:** ₱{abs_vals['current_expenses']:,.0f} → ₱{abs_vals['scenario_expenses']:,.0f}")
-                            st.write(f"**Savings:** ₱{abs_vals['current_savings']:,.0f} → ₱{abs_vals['scenario_savings']:,.0f}")
-                            if abs_vals['current_debt'] > 0:
-                                st.write(f"**Debt:** ₱{abs_vals['current_debt']:,.0f} → ₱{abs_vals['scenario_debt']:,.0f}")
-                            if abs_vals['current_investments'] > 0:
-                                st.write(f"**Investments:** ₱{abs_vals['current_investments']:,.0f} → ₱{abs_vals['scenario_investments']:,.0f}")
-                            if abs_vals['current_emergency'] > 0:
-                                st.write(f"**Emergency Fund:** ₱{abs_vals['current_emergency']:,.0f} → ₱{abs_vals['scenario_emergency']:,.0f}")
+                    with st.expander("💰 Scenario Values"):
+                        st.write(f"**Income:** ₱{current_income:,.0f} → ₱{values['income'][i]:,.0f}")
+                        st.write(f"**Expenses:** ₱{current_expenses:,.0f} → ₱{values['expenses'][i]:,.0f}")
+                        st.write(f"**Savings:** ₱{current_savings:,.0f} → ₱{values['savings'][i]:,.0f}")
+                        if current_debt > 0:
+                            st.write(f"**Debt:** ₱{current_debt:,.0f} → ₱{values['debt'][i]:,.0f}")
+                        if current_investments > 0:
+                            st.write(f"**Investments:** ₱{current_investments:,.0f} → ₱{values['total_investments'][i]:,.0f}")
+                        if current_emergency > 0:
+                            st.write(f"**Emergency Fund:** ₱{current_emergency:,.0f} → ₱{values['emergency_fund'][i]:,.0f}")
                 
                 with col3:
-                    if st.button("🗑️ Delete", key=f"delete_scenario_{i}"):
-                        st.session_state.saved_scenarios.pop(i)
-                        st.rerun()
+                    st.button("🗑️ Delete", key=f"delete_scenario_{scenario['id']}",
+                              on_click=remove_saved_scenario, args=(scenario["id"],))
                     
                     # Load scenario button
-                    if st.button("📥 Load", key=f"load_scenario_{i}", help="Apply this scenario's settings"):
-                        # This would require updating the slider values, which is tricky in Streamlit
-                        # For now, we'll show the parameters
-                        st.info("💡 Tip: Note the parameter values above and manually adjust the sliders to recreate this scenario.")
+                    st.button("📥 Load", key=f"load_scenario_{scenario['id']}", help="Apply this scenario's settings",
+                              on_click=apply_scenario_params, args=(scenario["params"], scenario["name"]))
+
+# ===============================
+# SCENARIO COMPARISON
+# ===============================
+
+with st.container(border=True):
+    st.subheader("⚖️ Compare Scenarios")
+    st.caption("Rank any mix of your saved scenarios and the quick scenarios side by side.")
+
+    candidates = {"current": ("Your scenario (sliders)", {**scenario_levers, "savings_abs_delta": savings_abs_delta,
+                                                          "debt_abs_delta": debt_abs_delta})}
+    for name, _, params in QUICK_PRESETS.values():
+        candidates[f"preset:{name}"] = (name, params)
+    for sc in st.session_state.get("saved_scenarios", []):
+        candidates[f"saved:{sc['id']}"] = (f"📁 {sc['name']}", sc["params"])
+
+    default_picks = ["current"] + [k for k in candidates if k.startswith("saved:")][:5]
+    picks = st.multiselect("Scenarios to compare", list(candidates), default=default_picks,
+                           format_func=lambda k: candidates[k][0], key="compare_picks")
+
+    if picks:
+        # One batch call scores every picked scenario
+        compared = evaluate_scenarios(current_profile, [candidates[k][1] for k in picks])
+        deltas = np.column_stack([compared["components"][c] - current_components[c] for c in FHI_WEIGHTS])
+        ranking = np.argsort(-compared["fhi"], kind="stable")
+
+        st.dataframe([
+            {
+                "Rank": rank + 1,
+                "Scenario": candidates[picks[i]][0],
+                "FHI": f"{compared['fhi'][i]:.1f}",
+                "Change": f"{compared['fhi'][i] - current_fhi_calc:+.1f}",
+                **{c: f"{deltas[i, j]:+.1f}" for j, c in enumerate(FHI_WEIGHTS)},
+            }
+            for rank, i in enumerate(ranking)
+        ], use_container_width=True, hide_index=True)
+
+        st.markdown("**Component changes by scenario**")
+        per_row = 3
+        for row_start in range(0, len(ranking), per_row):
+            cols = st.columns(per_row)
+            for col, i in zip(cols, ranking[row_start:row_start + per_row]):
+                with col:
+                    st.plotly_chart(component_deltas(f"{candidates[picks[i]][0]} ({compared['fhi'][i]:.1f})",
+                                                     tuple(FHI_WEIGHTS), tuple(deltas[i])),
+                                    use_container_width=True, key=f"compare_chart_{picks[i]}")
 
 st.markdown("---")
 st.caption("💡 **Tip**: Use this tool regularly to test different financial strategies and see their potential impact before making real changes to your finances.")
@@ -4,13 +4,13 @@ from datetime import datetime
 import hashlib
 import uuid
 import time
-import random
+
+from storage import goal_export_records, open_sheet, with_backoff
 
 # Import your existing auth helpers from the main app
 try:
     from supabase import create_client
     import gspread
-    from google.oauth2.service_account import Credentials
     AUTH_AVAILABLE = True
 except ImportError:
     AUTH_AVAILABLE = False
@@ -422,43 +422,6 @@ def init_supabase():
         st.error(f"Supabase initialization failed: {e}")
         return None
 
-@st.cache_resource
-def init_sheets_client():
-    """Initialize Google Sheets client"""
-    try:
-        sa_info = dict(st.secrets["GOOGLE_SERVICE_ACCOUNT"])
-        scopes = [
-            "https://www.googleapis.com/auth/spreadsheets",
-            "https://www.googleapis.com/auth/drive",
-        ]
-        creds = Credentials.from_service_account_info(sa_info, scopes=scopes)
-        return gspread.authorize(creds)
-    except Exception as e:
-        st.error(f"Google Sheets initialization failed: {e}")
-        return None
-
-@st.cache_resource
-def open_sheet():
-    """Open the main Google Sheet"""
-    try:
-        gc = init_sheets_client()
-        if gc:
-            return gc.open_by_key(st.secrets["SHEET_ID"])
-        return None
-    except Exception as e:
-        st.error(f"Failed to open Google Sheet: {e}")
-        return None
-
-def with_backoff(fn, tries: int = 4):
-    """Run fn() with exponential backoff on transient errors."""
-    for i in range(tries):
-        try:
-            return fn()
-        except Exception as e:
-            if i == tries - 1:
-                raise
-            time.sleep((2 ** i) + random.random())
-
 def log_auth_event(event: str, user: dict, note: str = ""):
     """Log authentication events"""
     try:
@@ -479,7 +442,7 @@ def log_auth_event(event: str, user: dict, note: str = ""):
             user.get("email"),
             (user.get("user_metadata") or {}).get("username"),
             note
-        ], value_input_option="USER_ENTERED"))
+        ], value_input_option="USER_ENTERED"), tries=4)
     except Exception:
         pass  # Silent fail for logging
 
@@ -537,7 +500,7 @@ def upsert_user_row(user: dict, payload: dict = None):
                 base_data.update(payload)
             
             row = [base_data.get(col, "") for col in header]
-            with_backoff(lambda: ws.append_row(row, value_input_option="USER_ENTERED"))
+            with_backoff(lambda: ws.append_row(row, value_input_option="USER_ENTERED"), tries=4)
             
     except Exception:
         pass  # Silent fail for logging
@@ -579,7 +542,8 @@ def sign_out():
     
     # Clear session state
     st.session_state.auth = {"user": None, "session": None}
-    for k in ["auth_method", "user_id", "email", "display_name"]:
+    for k in ["auth_method", "user_id", "email", "display_name", "goals", "goals_loaded_for", "selected_goal",
+              "saved_scenarios", "scenarios_loaded_for", "persisted_financial_data", "fhi_saved_inputs"]:
         st.session_state.pop(k, None)
     
     st.session_state.auth_message = "Successfully signed out!"
@@ -651,7 +615,8 @@ def export_my_data_ui():
             "created_at": datetime.now().isoformat(),
         },
         "calculations": [],  # Your FHI calculations
-        "goals": [],  # User goals
+        "goals": goal_export_records(st.session_state.get("goals", {})),  # User goals
+        "scenarios": st.session_state.get("saved_scenarios", []),  # Saved What-if scenarios
         "preferences": {}  # User preferences
     }
 
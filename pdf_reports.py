@@ -0,0 +1,596 @@
+"""PDF and text report generation with a content-addressed report cache.
+
+Rendered PDFs are cached on a hash of everything that appears in the report
+(FHI, components, user inputs) plus PDF_TEMPLATE_VERSION, so repeat downloads
+of an unchanged report skip layout and rendering. The in-memory tier is a
+per-process LRU; set FYNSTRA_PDF_CACHE_DIR to also keep reports on disk.
+Reports can also be rendered ahead of time on a small background worker pool
+(see prefetch_pdf_report) so the download is ready before it is requested.
+"""
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+
+import streamlit as st
+
+try:
+    from reportlab.platypus import (
+        SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+    )
+    from reportlab.platypus.flowables import HRFlowable
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib import colors
+    from reportlab.graphics.shapes import Drawing, Group, Rect, String
+    from reportlab.graphics.charts.barcharts import HorizontalBarChart
+    PDF_AVAILABLE = True
+except ImportError:
+    PDF_AVAILABLE = False
+
+# Bump whenever the report layout or wording changes so cached reports are not reused
+PDF_TEMPLATE_VERSION = 2
+PDF_CACHE_ENTRIES = 64
+PDF_CACHE_DIR = os.environ.get("FYNSTRA_PDF_CACHE_DIR")
+PDF_WORKERS = 2
+PDF_MAX_PENDING = 8  # speculative renders queued or running at once, across all sessions
+
+# ===============================
+# REPORT CACHE
+# ===============================
+
+def report_key(fhi_score, components, user_inputs):
+    """Content hash identifying a rendered report (the day is included so the "Generated on" line stays current)"""
+    canonical = json.dumps(
+        {"version": PDF_TEMPLATE_VERSION, "fhi": fhi_score, "components": components, "inputs": user_inputs,
+         "day": datetime.now().strftime("%Y-%m-%d")},
+        sort_keys=True, separators=(",", ":"), default=float,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+@st.cache_resource
+def _report_cache():
+    """Per-process LRU of rendered reports plus hit/miss and render-time counters"""
+    return {
+        "lock": threading.Lock(),
+        "entries": OrderedDict(),
+        "pending": {},
+        "memory_hits": 0,
+        "disk_hits": 0,
+        "misses": 0,
+        "renders": 0,
+        "render_seconds": 0.0,
+        "last_render_seconds": None,
+    }
+
+def _disk_path(key):
+    return os.path.join(PDF_CACHE_DIR, f"{key}.pdf") if PDF_CACHE_DIR else None
+
+def _remember(cache, key, pdf_data):
+    cache["entries"][key] = pdf_data
+    cache["entries"].move_to_end(key)
+    while len(cache["entries"]) > PDF_CACHE_ENTRIES:
+        cache["entries"].popitem(last=False)
+
+def cached_report(key):
+    """Return cached PDF bytes for a report key, or None (counted as a miss)"""
+    cache = _report_cache()
+    with cache["lock"]:
+        pdf_data = cache["entries"].get(key)
+        if pdf_data is not None:
+            cache["entries"].move_to_end(key)
+            cache["memory_hits"] += 1
+            return pdf_data
+
+    path = _disk_path(key)
+    if path and os.path.exists(path):
+        try:
+            with open(path, "rb") as f:
+                pdf_data = f.read()
+        except OSError:
+            pdf_data = None
+        if pdf_data:
+            with cache["lock"]:
+                _remember(cache, key, pdf_data)
+                cache["disk_hits"] += 1
+            return pdf_data
+
+    with cache["lock"]:
+        cache["misses"] += 1
+    return None
+
+def store_report(key, pdf_data, render_seconds):
+    """Cache freshly rendered PDF bytes and record how long the render took"""
+    cache = _report_cache()
+    with cache["lock"]:
+        _remember(cache, key, pdf_data)
+        cache["renders"] += 1
+        cache["render_seconds"] += render_seconds
+        cache["last_render_seconds"] = render_seconds
+
+    path = _disk_path(key)
+    if path:
+        try:
+            os.makedirs(PDF_CACHE_DIR, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(pdf_data)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass  # the disk tier is best-effort; the memory tier already has the report
+
+def report_cache_stats():
+    """Hit rate and render-time metrics for the report cache"""
+    cache = _report_cache()
+    with cache["lock"]:
+        hits = cache["memory_hits"] + cache["disk_hits"]
+        lookups = hits + cache["misses"]
+        return {
+            "entries": len(cache["entries"]),
+            "memory_hits": cache["memory_hits"],
+            "disk_hits": cache["disk_hits"],
+            "misses": cache["misses"],
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "renders": cache["renders"],
+            "mean_render_ms": 1000 * cache["render_seconds"] / cache["renders"] if cache["renders"] else None,
+            "last_render_ms": 1000 * cache["last_render_seconds"] if cache["last_render_seconds"] is not None else None,
+        }
+
+# ===============================
+# PDF GENERATION
+# ===============================
+
+# Fynstra color palette
+PALETTE = {
+    "red": "#fc3134",
+    "orange": "#ff5f1f",
+    "gold": "#ffc542",
+    "dark_gray": "#333333",
+    "medium_gray": "#666666",
+    "light_gray": "#f8f9fa",
+    "border": "#e5e7eb",
+}
+
+@st.cache_resource
+def pdf_palette():
+    """ReportLab colors for the Fynstra palette, built once per process"""
+    if not PDF_AVAILABLE:
+        return None
+    return {name: colors.HexColor(value) for name, value in PALETTE.items()}
+
+@st.cache_resource
+def create_pdf_styles():
+    """Create PDF styles matching Fynstra's color scheme (built once per process; treat as read-only)"""
+    if not PDF_AVAILABLE:
+        return None
+        
+    base_styles = getSampleStyleSheet()
+    palette = pdf_palette()
+    
+    styles = {
+        "title": ParagraphStyle(
+            "title",
+            parent=base_styles["Heading1"],
+            fontName="Helvetica-Bold",
+            fontSize=24,
+            leading=28,
+            textColor=palette["red"],
+            spaceAfter=12,
+            alignment=1,
+        ),
+        "subtitle": ParagraphStyle(
+            "subtitle",
+            parent=base_styles["BodyText"],
+            fontName="Helvetica",
+            fontSize=12,
+            leading=16,
+            textColor=palette["medium_gray"],
+            spaceAfter=16,
+            alignment=1,
+        ),
+        "section_header": ParagraphStyle(
+            "section_header",
+            parent=base_styles["Heading2"],
+            fontName="Helvetica-Bold",
+            fontSize=16,
+            leading=20,
+            textColor=palette["orange"],
+            spaceBefore=12,
+            spaceAfter=8,
+        ),
+        "body": ParagraphStyle(
+            "body",
+            parent=base_styles["BodyText"],
+            fontName="Helvetica",
+            fontSize=11,
+            leading=15,
+            textColor=palette["dark_gray"],
+            spaceAfter=8,
+        ),
+        "small": ParagraphStyle(
+            "small",
+            parent=base_styles["BodyText"],
+            fontName="Helvetica",
+            fontSize=9,
+            leading=12,
+            textColor=palette["medium_gray"],
+            spaceAfter=4,
+        ),
+        "score": ParagraphStyle(
+            "score",
+            parent=base_styles["Heading1"],
+            fontName="Helvetica-Bold",
+            fontSize=36,
+            leading=40,
+            textColor=palette["red"],
+            alignment=1,
+        ),
+    }
+    return styles, palette["red"], palette["orange"], palette["gold"], palette["light_gray"]
+
+@st.cache_resource
+def _static_pdf_assets():
+    """Shapes and table styles that are identical in every report, built once per process.
+
+    They are only read while rendering, so concurrent renders can share them.
+    """
+    if not PDF_AVAILABLE:
+        return None
+    palette = pdf_palette()
+
+    banner = Group(
+        # Background rectangle
+        Rect(0, 0, 500, 80, fillColor=colors.white, strokeColor=palette["border"], strokeWidth=1),
+        # Gradient bar at top
+        Rect(0, 70, 250, 10, fillColor=palette["red"], strokeColor=None),
+        Rect(250, 70, 250, 10, fillColor=palette["gold"], strokeColor=None),
+        String(20, 45, "Financial Health Index", fontName="Helvetica-Bold", fontSize=16,
+               fillColor=palette["dark_gray"]),
+        String(420, 40, "/ 100", fontName="Helvetica", fontSize=14, fillColor=palette["medium_gray"]),
+    )
+
+    table_style = TableStyle([
+        ("FONT", (0, 0), (-1, -1), "Helvetica", 10),
+        ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
+        ("TEXTCOLOR", (0, 0), (0, -1), palette["medium_gray"]),
+        ("TEXTCOLOR", (1, 0), (1, -1), palette["dark_gray"]),
+        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("ROWBACKGROUNDS", (0, 0), (-1, -1), [colors.white, palette["light_gray"]]),
+        ("LINEBELOW", (0, 0), (-1, -1), 0.5, palette["border"]),
+        ("LEFTPADDING", (0, 0), (-1, -1), 10),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 10),
+        ("TOPPADDING", (0, 0), (-1, -1), 8),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
+    ])
+    return {"banner": banner, "table_style": table_style}
+
+def create_fhi_score_banner(fhi_score: float):
+    """Create a visual banner for the FHI score"""
+    if not PDF_AVAILABLE:
+        return None
+        
+    d = Drawing(500, 80)
+    d.add(_static_pdf_assets()["banner"])
+    d.add(String(320, 35, f"{fhi_score:.1f}", fontName="Helvetica-Bold", fontSize=28,
+                 fillColor=pdf_palette()["red"]))
+    return d
+
+def create_component_chart(components: dict):
+    """Create a horizontal bar chart for component scores"""
+    if not PDF_AVAILABLE:
+        return None
+        
+    labels = list(components.keys())
+    values = [float(components[k]) for k in labels]
+    palette = pdf_palette()
+
+    # The chart lays itself out while drawing, so each report gets its own instance
+    d = Drawing(500, 250)
+    chart = HorizontalBarChart()
+    chart.x = 80
+    chart.y = 30
+    chart.height = 190
+    chart.width = 400
+    chart.data = [values]
+    chart.categoryAxis.categoryNames = labels
+    chart.categoryAxis.labels.fontName = "Helvetica"
+    chart.categoryAxis.labels.fontSize = 10
+    chart.valueAxis.valueMin = 0
+    chart.valueAxis.valueMax = 100
+    chart.valueAxis.labels.fontName = "Helvetica"
+    chart.valueAxis.labels.fontSize = 9
+    
+    # Fynstra color for bars
+    chart.bars[0].fillColor = palette["orange"]
+    chart.bars[0].strokeColor = colors.white
+    chart.barLabelFormat = "%0.0f"
+    chart.barLabels.fontName = "Helvetica-Bold"
+    chart.barLabels.fontSize = 9
+    chart.barLabels.fillColor = palette["dark_gray"]
+    
+    d.add(chart)
+    return d
+
+def create_data_table(data_rows):
+    """Create a styled table for financial data"""
+    if not PDF_AVAILABLE:
+        return None
+        
+    table = Table(data_rows, colWidths=[180, 200])
+    table.setStyle(_static_pdf_assets()["table_style"])
+    return table
+
+def render_fynstra_pdf(fhi_score: float, components: dict, user_inputs: dict) -> bytes:
+    """Lay out and render the PDF report (uncached; raises on failure)"""
+    styles, FYNSTRA_RED, FYNSTRA_ORANGE, FYNSTRA_GOLD, LIGHT_GRAY = create_pdf_styles()
+    
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        leftMargin=40,
+        rightMargin=40,
+        topMargin=40,
+        bottomMargin=40,
+        title="Fynstra Financial Health Report"
+    )
+    
+    story = []
+    
+    # Header
+    story.append(Paragraph("Financial Health Report", styles["title"]))
+    story.append(Paragraph(
+        f"Generated on {datetime.now().strftime('%B %d, %Y')} | Fynstra AI Platform",
+        styles["subtitle"]
+    ))
+    story.append(Spacer(1, 20))
+    
+    # FHI Score Banner
+    banner = create_fhi_score_banner(fhi_score)
+    if banner:
+        story.append(banner)
+    story.append(Spacer(1, 20))
+    
+    # Overall Assessment
+    if fhi_score >= 85:
+        assessment = "Excellent! You're in great financial shape and well-prepared for the future."
+    elif fhi_score >= 70:
+        assessment = "Good! You have a solid foundation. Stay consistent and work on gaps where needed."
+    elif fhi_score >= 50:
+        assessment = "Fair. You're on your way, but some areas need attention to build a stronger safety net."
+    else:
+        assessment = "Needs Improvement. Your finances require urgent attention."
+        
+    story.append(Paragraph("Overall Assessment", styles["section_header"]))
+    story.append(Paragraph(assessment, styles["body"]))
+    story.append(Spacer(1, 15))
+    
+    # Financial Profile
+    story.append(HRFlowable(width="100%", thickness=1, color=FYNSTRA_ORANGE))
+    story.append(Spacer(1, 10))
+    story.append(Paragraph("Your Financial Profile", styles["section_header"]))
+    
+    profile_data = [
+        ["Age", f"{user_inputs.get('age', 'N/A')} years"],
+        ["Monthly Income", f"₱{user_inputs.get('income', 0):,.0f}"],
+        ["Monthly Expenses", f"₱{user_inputs.get('expenses', 0):,.0f}"],
+        ["Monthly Savings", f"₱{user_inputs.get('savings', 0):,.0f}"],
+        ["Total Investments", f"₱{user_inputs.get('total_investments', 0):,.0f}"],
+        ["Net Worth", f"₱{user_inputs.get('net_worth', 0):,.0f}"],
+        ["Emergency Fund", f"₱{user_inputs.get('emergency_fund', 0):,.0f}"],
+    ]
+    
+    profile_table = create_data_table(profile_data)
+    if profile_table:
+        story.append(profile_table)
+    story.append(Spacer(1, 20))
+    
+    # Component Breakdown
+    story.append(HRFlowable(width="100%", thickness=1, color=FYNSTRA_ORANGE))
+    story.append(Spacer(1, 10))
+    story.append(Paragraph("Component Breakdown", styles["section_header"]))
+    story.append(Paragraph(
+        "Your FHI score is calculated from five key components. Each component is scored from 0 to 100, with higher scores indicating better financial health.",
+        styles["body"]
+    ))
+    story.append(Spacer(1, 10))
+    
+    # Component chart
+    chart = create_component_chart(components)
+    if chart:
+        story.append(chart)
+    story.append(Spacer(1, 15))
+    
+    # Component details
+    component_data = []
+    for component, score in components.items():
+        component_data.append([component, f"{score:.1f}/100"])
+    
+    component_table = create_data_table(component_data)
+    if component_table:
+        story.append(component_table)
+    story.append(Spacer(1, 20))
+    
+    # Recommendations
+    story.append(HRFlowable(width="100%", thickness=1, color=FYNSTRA_ORANGE))
+    story.append(Spacer(1, 10))
+    story.append(Paragraph("Key Recommendations", styles["section_header"]))
+    
+    recommendations = []
+    if components.get("Emergency Fund", 0) < 60:
+        recommendations.append("Build your emergency fund to cover 3-6 months of expenses")
+    if components.get("Debt-to-Income", 0) < 70:
+        recommendations.append("Focus on reducing high-interest debt to improve your debt-to-income ratio")
+    if components.get("Savings Rate", 0) < 20:
+        recommendations.append("Increase your monthly savings rate to at least 20% of income")
+    if components.get("Investment", 0) < 50:
+        recommendations.append("Start or increase regular investments for long-term wealth building")
+    if components.get("Net Worth", 0) < 50:
+        recommendations.append("Focus on building assets and reducing liabilities to grow net worth")
+    
+    if not recommendations:
+        recommendations.append("Continue your excellent financial habits and consider advanced investment strategies")
+    
+    for i, rec in enumerate(recommendations[:5], 1):
+        story.append(Paragraph(f"{i}. {rec}", styles["body"]))
+    
+    story.append(Spacer(1, 20))
+    
+    # Footer
+    story.append(HRFlowable(width="100%", thickness=0.5, color=LIGHT_GRAY))
+    story.append(Spacer(1, 10))
+    story.append(Paragraph(
+        "This report is for informational purposes only and does not constitute financial advice. "
+        "For personalized financial planning, consult with a qualified financial advisor.",
+        styles["small"]
+    ))
+    story.append(Spacer(1, 5))
+    story.append(Paragraph(
+        "Generated by Fynstra AI - Your AI-Powered Financial Strategy Platform",
+        styles["small"]
+    ))
+    
+    doc.build(story)
+    pdf_data = buffer.getvalue()
+    buffer.close()
+    return pdf_data
+
+def generate_fynstra_pdf(fhi_score: float, components: dict, user_inputs: dict) -> bytes:
+    """Generate a professional PDF report with Fynstra branding, reusing cached bytes for identical reports"""
+    if not PDF_AVAILABLE:
+        return generate_text_report(fhi_score, components, user_inputs).encode('utf-8')
+
+    key = report_key(fhi_score, components, user_inputs)
+    pdf_data = cached_report(key)
+    if pdf_data is not None:
+        return pdf_data
+
+    try:
+        start = time.perf_counter()
+        pdf_data = render_fynstra_pdf(fhi_score, components, user_inputs)
+    except Exception as e:
+        st.error(f"PDF generation failed: {e}. Generating text report instead.")
+        return generate_text_report(fhi_score, components, user_inputs).encode('utf-8')
+    store_report(key, pdf_data, time.perf_counter() - start)
+    return pdf_data
+
+# ===============================
+# BACKGROUND RENDERING
+# ===============================
+
+@st.cache_resource
+def _render_pool():
+    """Bounded worker pool shared by all sessions in this process"""
+    return ThreadPoolExecutor(max_workers=PDF_WORKERS, thread_name_prefix="pdf-report")
+
+def _render_job(handle, fhi_score, components, user_inputs):
+    handle["started_at"] = time.perf_counter()
+    try:
+        pdf_data = render_fynstra_pdf(fhi_score, components, user_inputs)
+        store_report(handle["key"], pdf_data, time.perf_counter() - handle["started_at"])
+        return pdf_data
+    finally:
+        cache = _report_cache()
+        with cache["lock"]:
+            cache["pending"].pop(handle["key"], None)
+
+def prefetch_pdf_report(fhi_score, components, user_inputs):
+    """Start rendering a report in the background and return a handle to poll with report_progress.
+
+    Cached reports come back as an already-finished handle, and a report that is
+    already being rendered (for any session) shares the running job. Returns None
+    when PDF_MAX_PENDING renders are already queued, so the caller renders on demand.
+    Pass handles that are no longer needed to cancel_pdf_report.
+    """
+    key = report_key(fhi_score, components, user_inputs)
+    cache = _report_cache()
+    with cache["lock"]:
+        handle = cache["pending"].get(key)
+        if handle is not None:
+            handle["waiters"] += 1
+            return handle
+
+    pdf_data = cached_report(key)
+    if pdf_data is not None:
+        future = Future()
+        future.set_result(pdf_data)
+        return {"key": key, "future": future, "started_at": None, "waiters": 1}
+
+    with cache["lock"]:
+        handle = cache["pending"].get(key)
+        if handle is not None:
+            handle["waiters"] += 1
+        elif len(cache["pending"]) >= PDF_MAX_PENDING:
+            return None
+        else:
+            handle = {"key": key, "future": None, "started_at": None, "waiters": 1}
+            cache["pending"][key] = handle
+            handle["future"] = _render_pool().submit(_render_job, handle, fhi_score, components,
+                                                     user_inputs)
+    return handle
+
+def cancel_pdf_report(handle):
+    """Release a prefetch handle; a render nobody else is waiting for is cancelled if it has not started"""
+    cache = _report_cache()
+    with cache["lock"]:
+        handle["waiters"] -= 1
+        if handle["waiters"] <= 0 and handle["future"].cancel() and cache["pending"].get(handle["key"]) is handle:
+            del cache["pending"][handle["key"]]
+
+def report_progress(handle):
+    """Return (state, fraction) for a prefetch handle; state is queued, rendering, done or failed.
+
+    The fraction while rendering is estimated from the average render time so far.
+    """
+    future = handle["future"]
+    if future.done():
+        return ("failed", 1.0) if future.cancelled() or future.exception() is not None else ("done", 1.0)
+    if handle["started_at"] is None:
+        return "queued", 0.0
+    mean_ms = report_cache_stats()["mean_render_ms"]
+    elapsed_ms = 1000 * (time.perf_counter() - handle["started_at"])
+    return "rendering", min(elapsed_ms / mean_ms, 0.95) if mean_ms else 0.5
+
+# ===============================
+# TEXT REPORT
+# ===============================
+
+def generate_text_report(fhi_score, components, user_data):
+    """Generate a text report for download"""
+    report = f"""
+FYNSTRA FINANCIAL HEALTH REPORT
+Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+===========================================
+OVERALL FINANCIAL HEALTH INDEX (FHI): {fhi_score}/100
+===========================================
+
+USER PROFILE:
+Age: {user_data['age']} years
+Monthly Income: ₱{user_data['income']:,.2f}
+Monthly Expenses: ₱{user_data['expenses']:,.2f}
+Monthly Savings: ₱{user_data['savings']:,.2f}
+
+COMPONENT BREAKDOWN:
+"""
+    
+    for component, score in components.items():
+        report += f"\n{component}: {score:.1f}/100"
+        
+    report += f"""
+
+RECOMMENDATIONS:
+- Focus on improving components scoring below 60
+- Maintain consistency in savings and investments
+- Review and adjust your financial strategy regularly
+
+This report was generated by Fynstra AI - Your Financial Strategy Platform
+"""
+    
+    return report
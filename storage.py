@@ -0,0 +1,223 @@
+"""Google Sheets storage layer shared by the app pages"""
+import json
+import random
+import time
+from datetime import date, datetime
+
+import streamlit as st
+
+from goal_planning import empty_progress, encode_progress, normalize_progress, set_month_range
+from month_calendar import month_label, parse_month_label
+
+try:
+    import gspread
+    from google.oauth2.service_account import Credentials
+    STORAGE_AVAILABLE = True
+except ImportError:
+    STORAGE_AVAILABLE = False
+
+SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive",
+]
+
+# Goals are stored as append-only logs: a goal row is a full snapshot of the goal's
+# settings (latest row wins), and every roadmap checkbox toggle is one small delta row.
+GOALS_SHEET = "Goals"
+GOALS_HEADER = ["ts", "user_id", "goal_id", "name", "goal_amount", "start_date", "target_date",
+                "emoji", "use_recommended_fhi", "priority"]
+GOAL_PROGRESS_SHEET = "Goal_Progress"
+GOAL_PROGRESS_HEADER = ["ts", "user_id", "goal_id", "month", "value"]  # month: "YYYY-MM" or "YYYY-MM..YYYY-MM"
+
+# Sandbox scenarios: one row per save or delete, latest row per scenario_id wins
+SCENARIOS_SHEET = "Scenarios"
+SCENARIOS_HEADER = ["ts", "user_id", "scenario_id", "name", "params", "deleted"]
+
+# ===============================
+# CONNECTION HELPERS
+# ===============================
+
+@st.cache_resource
+def open_sheet():
+    """Open the main Google Sheet (one client per process)"""
+    if not STORAGE_AVAILABLE:
+        return None
+    try:
+        sa_info = dict(st.secrets["GOOGLE_SERVICE_ACCOUNT"])
+        creds = Credentials.from_service_account_info(sa_info, scopes=SCOPES)
+        return gspread.authorize(creds).open_by_key(st.secrets["SHEET_ID"])
+    except Exception as e:
+        st.error(f"Failed to open Google Sheet: {e}")
+        return None
+
+def is_rate_limited(error):
+    """True if an API error is a Sheets quota / rate-limit error"""
+    return "429" in str(error) or "Quota exceeded" in str(error)
+
+def with_backoff(fn, tries: int = 3):
+    """Run fn() with exponential backoff, waiting longer on rate-limit errors"""
+    for i in range(tries):
+        try:
+            return fn()
+        except Exception as e:
+            if i == tries - 1:
+                raise
+            wait_time = (2 ** i) + (random.uniform(5, 15) if is_rate_limited(e) else random.random())
+            time.sleep(wait_time)
+
+@st.cache_resource
+def _worksheet_cache():
+    return {}
+
+def get_worksheet(title, header):
+    """Return a worksheet, creating it with the given header row if it does not exist"""
+    cache = _worksheet_cache()
+    if title in cache:
+        return cache[title]
+
+    sh = open_sheet()
+    if not sh:
+        return None
+    try:
+        ws = sh.worksheet(title)
+    except gspread.WorksheetNotFound:
+        ws = sh.add_worksheet(title=title, rows=1000, cols=len(header))
+        with_backoff(lambda: ws.append_row(header))
+    cache[title] = ws
+    return ws
+
+def append_rows(title, header, rows):
+    """Append rows to a log worksheet in a single request"""
+    try:
+        ws = get_worksheet(title, header)
+        if not ws:
+            return False
+        with_backoff(lambda: ws.append_rows(rows, value_input_option="RAW"))
+        return True
+    except Exception as e:
+        if is_rate_limited(e):
+            st.warning("⏳ API rate limit reached. Your change will be saved next time.")
+        else:
+            st.error(f"Error saving data: {e}")
+        return False
+
+def read_user_rows(title, header, user_id):
+    """Return this user's rows of a log worksheet as dicts, oldest first"""
+    ws = get_worksheet(title, header)
+    if not ws:
+        return []
+    values = with_backoff(ws.get_all_values)
+    if not values or "user_id" not in values[0]:
+        return []
+    columns = values[0]
+    uid_idx = columns.index("user_id")
+    return [
+        dict(zip(columns, row)) for row in values[1:]
+        if len(row) > uid_idx and row[uid_idx] == user_id
+    ]
+
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+# ===============================
+# GOALS
+# ===============================
+
+def save_goal(user_id, goal_id, goal):
+    """Write a snapshot of a goal's settings (progress is stored as deltas)"""
+    row = [
+        _now(), user_id, goal_id, goal.get("name", ""), goal.get("goal_amount", 1000.0),
+        goal.get("start_date", date.today()).isoformat(), goal.get("target_date", date.today()).isoformat(),
+        goal.get("emoji", "🎯"), int(bool(goal.get("use_recommended_fhi", True))), goal.get("priority", "Medium"),
+    ]
+    return append_rows(GOALS_SHEET, GOALS_HEADER, [row])
+
+def save_goal_progress(user_id, goal_id, first_month, value, last_month=None):
+    """Record a roadmap toggle for one month, or a bulk update of a month range, as one row"""
+    months = month_label(first_month)
+    if last_month is not None and last_month != first_month:
+        months += ".." + month_label(last_month)
+    return append_rows(GOAL_PROGRESS_SHEET, GOAL_PROGRESS_HEADER,
+                       [[_now(), user_id, goal_id, months, int(bool(value))]])
+
+def goal_export_records(goals):
+    """Serialize goals for a data export"""
+    return [
+        {
+            "goal_id": goal_id,
+            "name": goal.get("name", ""),
+            "goal_amount": goal.get("goal_amount", 1000.0),
+            "start_date": goal.get("start_date", date.today()).isoformat(),
+            "target_date": goal.get("target_date", date.today()).isoformat(),
+            "emoji": goal.get("emoji", "🎯"),
+            "use_recommended_fhi": goal.get("use_recommended_fhi", True),
+            "priority": goal.get("priority", "Medium"),
+            "progress": encode_progress(normalize_progress(goal.get("progress"))),
+        }
+        for goal_id, goal in goals.items()
+    ]
+
+def load_goals(user_id):
+    """Rebuild a user's goals from the latest settings snapshots plus replayed progress deltas"""
+    try:
+        goals = {}
+        for row in read_user_rows(GOALS_SHEET, GOALS_HEADER, user_id):
+            goals[row["goal_id"]] = {
+                "name": row["name"],
+                "goal_amount": float(row["goal_amount"] or 1000.0),
+                "start_date": date.fromisoformat(row["start_date"]),
+                "target_date": date.fromisoformat(row["target_date"]),
+                "use_recommended_fhi": row["use_recommended_fhi"] not in ("0", "False", ""),
+                "emoji": row["emoji"] or "🎯",
+                "priority": row.get("priority") or "Medium",
+                "progress": empty_progress(),
+            }
+
+        for row in read_user_rows(GOAL_PROGRESS_SHEET, GOAL_PROGRESS_HEADER, user_id):
+            goal = goals.get(row["goal_id"])
+            if goal is not None:
+                first, _, last = row["month"].partition("..")
+                set_month_range(goal["progress"], parse_month_label(first), parse_month_label(last or first),
+                                row["value"] == "1")
+        return goals
+    except Exception as e:
+        if is_rate_limited(e):
+            st.warning("⏳ API rate limit reached. Please try loading your goals again in a few minutes.")
+        else:
+            st.error(f"Error loading goals: {e}")
+        return None
+
+# ===============================
+# SCENARIOS
+# ===============================
+
+def save_scenario(user_id, scenario):
+    """Write a saved scenario ({"id", "name", "params", "saved_at"}) as one compact row"""
+    params = json.dumps(scenario["params"], separators=(",", ":"), sort_keys=True)
+    return append_rows(SCENARIOS_SHEET, SCENARIOS_HEADER,
+                       [[scenario.get("saved_at") or _now(), user_id, scenario["id"], scenario["name"], params, 0]])
+
+def delete_scenario(user_id, scenario_id):
+    """Mark a saved scenario as deleted"""
+    return append_rows(SCENARIOS_SHEET, SCENARIOS_HEADER, [[_now(), user_id, scenario_id, "", "{}", 1]])
+
+def load_scenarios(user_id):
+    """Return a user's saved scenarios, oldest first"""
+    try:
+        latest = {}
+        for row in read_user_rows(SCENARIOS_SHEET, SCENARIOS_HEADER, user_id):
+            latest.pop(row["scenario_id"], None)
+            if row.get("deleted") != "1":
+                latest[row["scenario_id"]] = {
+                    "id": row["scenario_id"],
+                    "name": row["name"],
+                    "params": json.loads(row["params"] or "{}"),
+                    "saved_at": row["ts"],
+                }
+        return list(latest.values())
+    except Exception as e:
+        if is_rate_limited(e):
+            st.warning("⏳ API rate limit reached. Please try loading your scenarios again in a few minutes.")
+        else:
+            st.error(f"Error loading scenarios: {e}")
+        return None